@@ -0,0 +1,94 @@
+"""
+Cache mémoire à expiration pour les réponses et analyses Haloscan
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .serialization import dumps
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Construit une clé de cache stable à partir de paramètres JSON-sérialisables"""
+    return hashlib.blake2b(dumps(parts, sort_keys=True), digest_size=16).hexdigest()
+
+
+class TTLCache:
+    """Cache clé -> valeur borné en taille (éviction LRU) avec durée de vie par entrée
+
+    Les valeurs sont partagées entre les appelants : elles ne doivent pas être modifiées
+    après leur mise en cache.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retourne la valeur associée à la clé, ou None si absente ou expirée"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Enregistre une valeur pour la durée de vie du cache, ou pour ttl secondes si précisé
+
+        La durée de vie du cache borne celle de chaque entrée. Un cache créé avec une durée de
+        vie nulle est désactivé et n'enregistre rien.
+        """
+        if self.ttl <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl)), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vide le cache"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight:
+    """Regroupe les appels concurrents portant sur la même clé en un seul appel réel
+
+    L'appel réel s'exécute dans une tâche détachée que tous les appelants, y compris le
+    premier, attendent via asyncio.shield : l'annulation d'un appelant (client déconnecté)
+    n'interrompt ni l'appel ni les autres appelants, qui reçoivent son résultat ou son exception.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Exécute call() pour la clé, ou attend l'appel identique déjà en cours"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: "asyncio.Task[Any]") -> None:
+        """Retire l'appel terminé et marque son exception comme consultée"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -14,6 +14,11 @@ class Config:
     # === HALOSCAN API ===
     HALOSCAN_API_KEY: str = os.getenv("HALOSCAN_API_KEY", "")
     HALOSCAN_BASE_URL: str = os.getenv("HALOSCAN_BASE_URL", "https://api.haloscan.com/api")
+    # Quota de requêtes : au plus HALOSCAN_RATE_LIMIT requêtes par HALOSCAN_RATE_PERIOD secondes
+    HALOSCAN_RATE_LIMIT: int = int(os.getenv("HALOSCAN_RATE_LIMIT", "290"))
+    HALOSCAN_RATE_PERIOD: float = float(os.getenv("HALOSCAN_RATE_PERIOD", "300"))
+    # Taille du pool de connexions HTTP keep-alive partagé par tous les outils
+    HALOSCAN_MAX_CONNECTIONS: int = int(os.getenv("HALOSCAN_MAX_CONNECTIONS", "32"))
     
     # === OPENAI API ===
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -29,6 +34,9 @@ class Config:
     # === LOGS ===
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
+    # === CACHE ===
+    HALOSCAN_CACHE_TTL: int = int(os.getenv("HALOSCAN_CACHE_TTL", "3600"))
+    
     # === MCP ===
     MCP_SERVER_NAME: str = os.getenv("MCP_SERVER_NAME", "Haloscan SEO Tools")
     MCP_SERVER_VERSION: str = os.getenv("MCP_SERVER_VERSION", "1.0.0")
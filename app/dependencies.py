@@ -2,8 +2,17 @@
 Dépendances communes pour l'API Haloscan
 """
 
+from typing import Optional
+
 import httpx
 from .config import Config
+from .rate_limit import AsyncRateLimiter
+from .serialization import dumps, loads
+
+try:
+    import h2  # support HTTP/2 de httpx
+except ImportError:  # h2 est optionnel : connexions HTTP/1.1 keep-alive sinon
+    h2 = None
 
 
 class HaloscanClient:
@@ -16,19 +25,49 @@ class HaloscanClient:
             "haloscan-api-key": Config.HALOSCAN_API_KEY
         }
         self.base_url = Config.HALOSCAN_BASE_URL
+        self._client: Optional[httpx.AsyncClient] = None
+        # Quota partagé par tous les outils utilisant ce client
+        self._rate_limiter = AsyncRateLimiter(Config.HALOSCAN_RATE_LIMIT, Config.HALOSCAN_RATE_PERIOD)
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Retourne le client HTTP partagé (connexions keep-alive réutilisées entre les appels)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                # Négocié via ALPN : repli automatique sur HTTP/1.1 si le serveur ne le propose pas
+                http2=h2 is not None,
+                limits=httpx.Limits(
+                    max_connections=Config.HALOSCAN_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.HALOSCAN_MAX_CONNECTIONS,
+                    keepalive_expiry=75.0
+                )
+            )
+        return self._client
     
     async def request(self, endpoint: str, data: dict = None) -> dict:
         """Méthode unifiée pour toutes les requêtes"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{self.base_url}/{endpoint}"
-            
+        client = self._get_client()
+        url = f"{self.base_url}/{endpoint}"
+        
+        async with self._rate_limiter:
             if data is None:
                 response = await client.get(url, headers=self.headers)
             else:
-                response = await client.post(url, headers=self.headers, json=data)
-            
-            response.raise_for_status()
-            return response.json()
+                # Corps encodé par le sérialiseur partagé (orjson s'il est installé)
+                response = await client.post(url, headers=self.headers, content=dumps(data))
+        
+        response.raise_for_status()
+        return loads(response.content)
+    
+    async def post_async(self, endpoint: str, data: dict) -> dict:
+        """Requête POST sur un endpoint Haloscan (utilisée par les outils MCP)"""
+        return await self.request(endpoint, data)
+    
+    async def aclose(self) -> None:
+        """Ferme le pool de connexions HTTP (arrêt de l'application)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 
     # Méthodes spécifiques pour l'API Haloscan
@@ -50,6 +50,10 @@ async def lifespan(app: FastAPI):
         raise
     
     yield
+    
+    # Arrêt : fermeture du pool de connexions Haloscan
+    from .dependencies import haloscan_client
+    await haloscan_client.aclose()
     print("🛑 Arrêt du serveur")
 
 
@@ -2,8 +2,9 @@
 Base classes pour les outils MCP Haloscan
 Architecture modulaire et scalable
 """
-from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+import asyncio
+from abc import ABC, abstractmethod, update_abstractmethods
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from ..dependencies import HaloscanClient
 from ..logging_config import get_logger
 
@@ -46,6 +47,35 @@ class BaseMCPTool(ABC):
         import traceback
         logger.error(f"📚 Stack trace: {traceback.format_exc()}")
     
+    async def _execute_per_domain(
+        self,
+        domains: List[str],
+        execute_one: Callable[[str], Awaitable[Dict[str, Any]]],
+        error_message: str,
+        concurrency: int = 8
+    ) -> Dict[str, Dict[str, Any]]:
+        """Exécute une analyse par domaine en parallèle (concurrence bornée)
+        
+        Les résultats sont indexés par domaine dans l'ordre reçu ; un domaine en échec
+        reçoit un dictionnaire d'erreur sans interrompre les autres.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def execute_domain(domain: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await execute_one(domain)
+        
+        analyses = await asyncio.gather(*(execute_domain(domain) for domain in domains), return_exceptions=True)
+        
+        results_by_domain = {}
+        for domain, analysis in zip(domains, analyses):
+            if isinstance(analysis, Exception):
+                logger.error(f"❌ {error_message} ({domain}): {str(analysis)}")
+                analysis = {"error": f"{error_message}: {str(analysis)}"}
+            results_by_domain[domain] = analysis
+        
+        return results_by_domain
+    
     async def safe_execute(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Exécution sécurisée avec gestion d'erreurs"""
         self._log_execution_start(arguments)
@@ -71,6 +101,24 @@ class BaseMCPTool(ABC):
                 "arguments_used": arguments
             }
 
+def tool_schema(definition: Dict[str, Any]):
+    """Décorateur de classe : associe à un outil MCP sa définition OpenAI précalculée
+    
+    La définition est construite une seule fois à l'import du module et partagée par toutes
+    les instances ; get_tool_definition se contente de la retourner.
+    """
+    def decorate(cls):
+        cls._tool_definition = definition
+        cls.get_tool_definition = _get_precomputed_tool_definition
+        return update_abstractmethods(cls)
+    
+    return decorate
+
+
+def _get_precomputed_tool_definition(self) -> Dict[str, Any]:
+    """Retourne la définition OpenAI précalculée de l'outil"""
+    return self._tool_definition
+
 class MCPToolRegistry:
     """Registre centralisé pour tous les outils MCP"""
     
@@ -3,13 +3,51 @@ MCP Tool pour l'endpoint Haloscan domains/gmbBacklinks
 Permet d'analyser les backlinks Google My Business d'un domaine
 """
 
-from typing import Dict, Any, List, Optional
+import heapq
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
 from ...base import BaseMCPTool
 from ....dependencies import HaloscanClient
 from ....logging_config import get_logger
 
 logger = get_logger("domains_gmb_backlinks_tool")
 
+
+def _r2(x: float) -> float:
+    """Arrondi d'affichage à 2 décimales sans passer par round() (valeurs positives)"""
+    if isinstance(x, int):
+        return float(x)
+    return int(x * 100 + 0.5) / 100.0
+
+
+@dataclass
+class _BusinessColumns:
+    """Colonnes numériques des entreprises (une liste par champ) pour les agrégats"""
+    rating_counts: array = field(default_factory=lambda: array("q"))
+    rating_values: array = field(default_factory=lambda: array("d"))
+    photos: array = field(default_factory=lambda: array("q"))
+    seo_values: array = field(default_factory=lambda: array("d"))
+    claimed: bytearray = field(default_factory=bytearray)
+    latitudes: array = field(default_factory=lambda: array("d"))
+    longitudes: array = field(default_factory=lambda: array("d"))
+
+
+# Messages de recommandation (gabarits formatés uniquement lorsqu'ils s'appliquent)
+_NO_BUSINESS_RECOMMENDATION = "Aucune entreprise GMB trouvée pour ce domaine"
+_DEFAULT_GMB_RECOMMENDATION = "📊 Analyse GMB terminée, consultez les données détaillées"
+_LOW_CLAIMED_TEMPLATE = "🏢 Seulement {claimed_rate:.0f}% des entreprises sont revendiquées, opportunité d'amélioration"
+_HIGH_CLAIMED_MESSAGE = "✅ Excellent taux de revendication des entreprises"
+_HIGH_RATING_MESSAGE = "⭐ Excellente réputation moyenne, maintenez la qualité"
+_LOW_RATING_MESSAGE = "📈 Note moyenne faible, travaillez l'expérience client"
+_FEW_REVIEWS_MESSAGE = "💬 Peu d'entreprises ont des avis, encouragez les retours clients"
+_FEW_PHOTOS_MESSAGE = "📸 Ajoutez plus de photos pour améliorer l'engagement"
+_HIGH_QUALITY_TEMPLATE = "🌟 {high_quality_count} entreprise(s) de qualité identifiée(s)"
+_HIGH_SEO_TEMPLATE = "🚀 {high_seo_count} entreprise(s) à fort potentiel SEO local"
+_DIVERSE_LOCATIONS_MESSAGE = "🗺️ Présence géographique diversifiée, bon pour le SEO local"
+_MANY_REVIEWS_MESSAGE = "💪 Forte base d'avis clients, excellent signal de confiance"
+
+
 class DomainsGmbBacklinksTool(BaseMCPTool):
     """Outil MCP pour analyser les backlinks Google My Business d'un domaine via l'API Haloscan"""
     
@@ -170,7 +208,6 @@ class DomainsGmbBacklinksTool(BaseMCPTool):
         try:
             results = response.get("results", [])
             total_count = response.get("total_result_count", 0)
-            filtered_count = response.get("filtered_result_count", 0)
             returned_count = response.get("returned_result_count", 0)
             
             if not results:
@@ -181,42 +218,24 @@ class DomainsGmbBacklinksTool(BaseMCPTool):
                     "businesses": []
                 }
             
+            # Une seule entreprise : pas de distribution à analyser
+            if len(results) == 1:
+                return self._fast_path(results, input_domain, response)
+            
             # Analyse des entreprises individuelles
-            analyzed_businesses = []
-            for business in results:
-                business_analysis = {
-                    "cid": business.get("cid", ""),
-                    "name": business.get("name", ""),
-                    "address": business.get("address", ""),
-                    "phone": business.get("phone", ""),
-                    "url": business.get("url", ""),
-                    "domain": business.get("domain", ""),
-                    "root_domain": business.get("root_domain", ""),
-                    "location": {
-                        "latitude": business.get("latitude"),
-                        "longitude": business.get("longitude")
-                    },
-                    "ratings": {
-                        "count": business.get("rating_count", 0),
-                        "value": business.get("rating_value", 0),
-                        "quality_score": self._calculate_rating_quality(business.get("rating_count", 0), business.get("rating_value", 0))
-                    },
-                    "categories": business.get("categories", ""),
-                    "is_claimed": bool(business.get("is_claimed", 0)),
-                    "total_photos": business.get("total_photos", 0),
-                    "business_quality": self._assess_business_quality(business),
-                    "local_seo_value": self._calculate_local_seo_value(business)
-                }
-                analyzed_businesses.append(business_analysis)
+            analyzed_businesses, columns = self._ingest_businesses(results)
             
             # Analyse des catégories
             categories_analysis = self._analyze_categories(analyzed_businesses)
             
             # Analyse géographique
-            geographic_analysis = self._analyze_geographic_distribution(analyzed_businesses)
+            geographic_analysis = self._analyze_geographic_distribution(columns)
+            
+            # Statistiques globales
+            stats = self._compute_statistics(columns, total_count, returned_count)
             
             # Analyse de la qualité
-            quality_analysis = self._analyze_business_quality(analyzed_businesses)
+            quality_analysis = self._analyze_business_quality(analyzed_businesses, columns, stats)
             
             # Top businesses par différents critères
             top_rated = sorted([b for b in analyzed_businesses if b["ratings"]["count"] > 0], 
@@ -226,20 +245,6 @@ class DomainsGmbBacklinksTool(BaseMCPTool):
             
             high_seo_value = sorted(analyzed_businesses, key=lambda x: x["local_seo_value"], reverse=True)[:5]
             
-            # Statistiques globales
-            stats = {
-                "total_businesses_found": total_count,
-                "businesses_analyzed": returned_count,
-                "claimed_businesses": sum(1 for b in analyzed_businesses if b["is_claimed"]),
-                "unclaimed_businesses": sum(1 for b in analyzed_businesses if not b["is_claimed"]),
-                "businesses_with_ratings": sum(1 for b in analyzed_businesses if b["ratings"]["count"] > 0),
-                "businesses_with_photos": sum(1 for b in analyzed_businesses if b["total_photos"] > 0),
-                "average_rating": round(sum(b["ratings"]["value"] for b in analyzed_businesses if b["ratings"]["value"] > 0) / 
-                                     len([b for b in analyzed_businesses if b["ratings"]["value"] > 0]), 2) if analyzed_businesses else 0,
-                "total_reviews": sum(b["ratings"]["count"] for b in analyzed_businesses),
-                "total_photos": sum(b["total_photos"] for b in analyzed_businesses)
-            }
-            
             return {
                 "summary": f"Analyse de {returned_count} entreprises GMB liées à {input_domain}",
                 "domain": input_domain,
@@ -252,18 +257,108 @@ class DomainsGmbBacklinksTool(BaseMCPTool):
                 "high_seo_value_businesses": high_seo_value,
                 "all_businesses": analyzed_businesses,
                 "recommendations": self._generate_gmb_recommendations(analyzed_businesses, stats),
-                "response_metadata": {
-                    "response_time": response.get("response_time", ""),
-                    "total_results": total_count,
-                    "filtered_results": filtered_count,
-                    "remaining_results": response.get("remaining_result_count", 0)
-                }
+                "response_metadata": self._build_response_metadata(response)
             }
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'analyse des résultats: {str(e)}")
             return {"error": f"Erreur lors de l'analyse des résultats: {str(e)}"}
     
+    def _fast_path(self, results: List[Dict[str, Any]], input_domain: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Synthèse minimale pour une réponse d'une seule entreprise (sans analyses de distribution)"""
+        analyzed_businesses, columns = self._ingest_businesses(results)
+        stats = self._compute_statistics(
+            columns,
+            response.get("total_result_count", 0),
+            response.get("returned_result_count", 0)
+        )
+
+        return {
+            "summary": f"Analyse de {len(analyzed_businesses)} entreprise GMB liée à {input_domain}",
+            "domain": input_domain,
+            "statistics": stats,
+            "all_businesses": analyzed_businesses,
+            "recommendations": self._generate_gmb_recommendations(analyzed_businesses, stats),
+            "response_metadata": self._build_response_metadata(response)
+        }
+    
+    def _ingest_businesses(self, results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], _BusinessColumns]:
+        """Analyse chaque entreprise et remplit les colonnes numériques en une seule passe"""
+        analyzed_businesses = []
+        columns = _BusinessColumns()
+        
+        for business in results:
+            analysis = self._analyze_business(business)
+            analyzed_businesses.append(analysis)
+            
+            columns.rating_counts.append(int(business.get("rating_count") or 0))
+            columns.rating_values.append(float(business.get("rating_value") or 0))
+            columns.photos.append(int(business.get("total_photos") or 0))
+            columns.seo_values.append(analysis["local_seo_value"])
+            columns.claimed.append(analysis["is_claimed"])
+            
+            lat = business.get("latitude")
+            lng = business.get("longitude")
+            if lat is not None and lng is not None:
+                columns.latitudes.append(lat)
+                columns.longitudes.append(lng)
+        
+        return analyzed_businesses, columns
+    
+    def _analyze_business(self, business: Dict[str, Any]) -> Dict[str, Any]:
+        """Construit l'analyse d'une entreprise GMB individuelle"""
+        return {
+            "cid": business.get("cid", ""),
+            "name": business.get("name", ""),
+            "address": business.get("address", ""),
+            "phone": business.get("phone", ""),
+            "url": business.get("url", ""),
+            "domain": business.get("domain", ""),
+            "root_domain": business.get("root_domain", ""),
+            "location": {
+                "latitude": business.get("latitude"),
+                "longitude": business.get("longitude")
+            },
+            "ratings": {
+                "count": business.get("rating_count", 0),
+                "value": business.get("rating_value", 0),
+                "quality_score": self._calculate_rating_quality(business.get("rating_count", 0), business.get("rating_value", 0))
+            },
+            "categories": business.get("categories", ""),
+            "is_claimed": bool(business.get("is_claimed", 0)),
+            "total_photos": business.get("total_photos", 0),
+            "business_quality": self._assess_business_quality(business),
+            "local_seo_value": self._calculate_local_seo_value(business)
+        }
+    
+    def _compute_statistics(self, columns: _BusinessColumns, total_count: int, returned_count: int) -> Dict[str, Any]:
+        """Calcule les statistiques globales à partir des colonnes numériques"""
+        rated_values = [value for value in columns.rating_values if value > 0]
+        total = len(columns.claimed)
+        claimed_count = sum(columns.claimed)
+        
+        return {
+            "total_businesses_found": total_count,
+            "businesses_analyzed": returned_count,
+            "claimed_businesses": claimed_count,
+            "unclaimed_businesses": total - claimed_count,
+            "claimed_rate": round(claimed_count / total * 100, 1) if total else 0,
+            "businesses_with_ratings": sum(1 for count in columns.rating_counts if count > 0),
+            "businesses_with_photos": sum(1 for photos in columns.photos if photos > 0),
+            "average_rating": _r2(sum(rated_values) / len(rated_values)) if rated_values else 0,
+            "total_reviews": sum(columns.rating_counts),
+            "total_photos": sum(columns.photos)
+        }
+    
+    def _build_response_metadata(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Extrait les métadonnées de la réponse API"""
+        return {
+            "response_time": response.get("response_time", ""),
+            "total_results": response.get("total_result_count", 0),
+            "filtered_results": response.get("filtered_result_count", 0),
+            "remaining_results": response.get("remaining_result_count", 0)
+        }
+    
     def _calculate_rating_quality(self, rating_count: int, rating_value: float) -> str:
         """Calcule la qualité des avis d'une entreprise"""
         if rating_count == 0:
@@ -355,7 +450,7 @@ class DomainsGmbBacklinksTool(BaseMCPTool):
         if business.get("address"):
             score += 2.5
         
-        return round(score, 2)
+        return _r2(score)
     
     def _analyze_categories(self, businesses: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyse la distribution des catégories d'entreprises"""
@@ -373,55 +468,48 @@ class DomainsGmbBacklinksTool(BaseMCPTool):
                         categories_count[category] = 0
                     categories_count[category] += 1
         
-        # Top catégories
-        top_categories = dict(sorted(categories_count.items(), key=lambda x: x[1], reverse=True)[:10])
+        # Top catégories (la première est aussi la plus fréquente)
+        top_categories = dict(heapq.nlargest(10, categories_count.items(), key=lambda x: x[1]))
         
         return {
             "total_unique_categories": len(categories_count),
             "top_categories": top_categories,
-            "most_common_category": max(categories_count.items(), key=lambda x: x[1])[0] if categories_count else None
+            "most_common_category": next(iter(top_categories)) if top_categories else None
         }
     
-    def _analyze_geographic_distribution(self, businesses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_geographic_distribution(self, columns: _BusinessColumns) -> Dict[str, Any]:
         """Analyse la distribution géographique des entreprises"""
-        locations = []
-        for business in businesses:
-            lat = business.get("location", {}).get("latitude")
-            lng = business.get("location", {}).get("longitude")
-            if lat is not None and lng is not None:
-                locations.append({"lat": lat, "lng": lng})
+        lats = columns.latitudes
+        lngs = columns.longitudes
         
-        if not locations:
+        if not lats:
             return {"has_location_data": False}
         
         # Calcul du centre géographique
-        center_lat = sum(loc["lat"] for loc in locations) / len(locations)
-        center_lng = sum(loc["lng"] for loc in locations) / len(locations)
+        center_lat = sum(lats) / len(lats)
+        center_lng = sum(lngs) / len(lngs)
         
-        # Calcul de la dispersion
-        distances = []
-        for loc in locations:
-            # Distance approximative en km
-            lat_diff = abs(loc["lat"] - center_lat)
-            lng_diff = abs(loc["lng"] - center_lng)
-            distance = ((lat_diff ** 2 + lng_diff ** 2) ** 0.5) * 111  # Approximation
-            distances.append(distance)
+        # Calcul de la dispersion (distance approximative en km)
+        distances = [
+            (((lat - center_lat) ** 2 + (lng - center_lng) ** 2) ** 0.5) * 111
+            for lat, lng in zip(lats, lngs)
+        ]
         
-        avg_distance = sum(distances) / len(distances) if distances else 0
-        max_distance = max(distances) if distances else 0
+        avg_distance = sum(distances) / len(distances)
+        max_distance = max(distances)
         
         return {
             "has_location_data": True,
-            "businesses_with_location": len(locations),
+            "businesses_with_location": len(lats),
             "geographic_center": {"latitude": round(center_lat, 6), "longitude": round(center_lng, 6)},
             "dispersion": {
-                "average_distance_km": round(avg_distance, 2),
-                "max_distance_km": round(max_distance, 2),
+                "average_distance_km": _r2(avg_distance),
+                "max_distance_km": _r2(max_distance),
                 "concentration_level": "high" if avg_distance < 10 else "medium" if avg_distance < 50 else "low"
             }
         }
     
-    def _analyze_business_quality(self, businesses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_business_quality(self, businesses: List[Dict[str, Any]], columns: _BusinessColumns, stats: Dict[str, Any]) -> Dict[str, Any]:
         """Analyse la qualité globale des entreprises"""
         quality_distribution = {"excellent": 0, "good": 0, "average": 0, "poor": 0}
         
@@ -430,66 +518,53 @@ class DomainsGmbBacklinksTool(BaseMCPTool):
             if quality in quality_distribution:
                 quality_distribution[quality] += 1
         
-        claimed_rate = sum(1 for b in businesses if b["is_claimed"]) / len(businesses) * 100 if businesses else 0
+        total = len(columns.seo_values)
         
         return {
             "quality_distribution": quality_distribution,
-            "claimed_rate": round(claimed_rate, 1),
-            "average_seo_value": round(sum(b["local_seo_value"] for b in businesses) / len(businesses), 2) if businesses else 0
+            "claimed_rate": stats["claimed_rate"],
+            "average_seo_value": _r2(sum(columns.seo_values) / total) if total else 0
         }
     
     def _generate_gmb_recommendations(self, businesses: List[Dict[str, Any]], stats: Dict[str, Any]) -> List[str]:
         """Génère des recommandations basées sur l'analyse des backlinks GMB"""
-        recommendations = []
-        
         if not businesses:
-            return ["Aucune entreprise GMB trouvée pour ce domaine"]
-        
-        # Analyse du statut de revendication
-        claimed_rate = (stats.get("claimed_businesses", 0) / stats.get("businesses_analyzed", 1)) * 100
-        if claimed_rate < 70:
-            recommendations.append(f"🏢 Seulement {claimed_rate:.0f}% des entreprises sont revendiquées, opportunité d'amélioration")
-        elif claimed_rate > 90:
-            recommendations.append("✅ Excellent taux de revendication des entreprises")
+            return [_NO_BUSINESS_RECOMMENDATION]
         
-        # Analyse des avis
+        total_businesses = stats.get("businesses_analyzed") or len(businesses)
+        claimed_rate = stats.get("claimed_rate", 0)
         avg_rating = stats.get("average_rating", 0)
-        if avg_rating >= 4.5:
-            recommendations.append("⭐ Excellente réputation moyenne, maintenez la qualité")
-        elif avg_rating < 3.5:
-            recommendations.append("📈 Note moyenne faible, travaillez l'expérience client")
-        
-        businesses_with_ratings = stats.get("businesses_with_ratings", 0)
-        total_businesses = stats.get("businesses_analyzed", 1)
-        rating_coverage = (businesses_with_ratings / total_businesses) * 100
-        
-        if rating_coverage < 50:
-            recommendations.append("💬 Peu d'entreprises ont des avis, encouragez les retours clients")
-        
-        # Analyse des photos
-        businesses_with_photos = stats.get("businesses_with_photos", 0)
-        photo_coverage = (businesses_with_photos / total_businesses) * 100
-        
-        if photo_coverage < 60:
-            recommendations.append("📸 Ajoutez plus de photos pour améliorer l'engagement")
-        
-        # Top performers
-        high_quality = [b for b in businesses if b["business_quality"] in ["excellent", "good"]]
-        if high_quality:
-            recommendations.append(f"🌟 {len(high_quality)} entreprise(s) de qualité identifiée(s)")
-        
-        # Opportunités SEO local
-        high_seo_businesses = [b for b in businesses if b["local_seo_value"] > 70]
-        if high_seo_businesses:
-            recommendations.append(f"🚀 {len(high_seo_businesses)} entreprise(s) à fort potentiel SEO local")
-        
-        # Analyse géographique
-        if len(businesses) > 5:
-            recommendations.append("🗺️ Présence géographique diversifiée, bon pour le SEO local")
-        
-        # Recommandation générale
-        total_reviews = stats.get("total_reviews", 0)
-        if total_reviews > 500:
-            recommendations.append("💪 Forte base d'avis clients, excellent signal de confiance")
-        
-        return recommendations if recommendations else ["📊 Analyse GMB terminée, consultez les données détaillées"]
+        rating_coverage = (stats.get("businesses_with_ratings", 0) / total_businesses) * 100
+        photo_coverage = (stats.get("businesses_with_photos", 0) / total_businesses) * 100
+        high_quality_count = sum(1 for b in businesses if b["business_quality"] in ("excellent", "good"))
+        high_seo_count = sum(1 for b in businesses if b["local_seo_value"] > 70)
+        
+        checks = [
+            # Analyse du statut de revendication
+            (claimed_rate < 70, _LOW_CLAIMED_TEMPLATE),
+            (claimed_rate > 90, _HIGH_CLAIMED_MESSAGE),
+            # Analyse des avis
+            (avg_rating >= 4.5, _HIGH_RATING_MESSAGE),
+            (avg_rating < 3.5, _LOW_RATING_MESSAGE),
+            (rating_coverage < 50, _FEW_REVIEWS_MESSAGE),
+            # Analyse des photos
+            (photo_coverage < 60, _FEW_PHOTOS_MESSAGE),
+            # Top performers
+            (high_quality_count > 0, _HIGH_QUALITY_TEMPLATE),
+            # Opportunités SEO local
+            (high_seo_count > 0, _HIGH_SEO_TEMPLATE),
+            # Analyse géographique
+            (len(businesses) > 5, _DIVERSE_LOCATIONS_MESSAGE),
+            # Recommandation générale
+            (stats.get("total_reviews", 0) > 500, _MANY_REVIEWS_MESSAGE),
+        ]
+        recommendations = [
+            message.format(
+                claimed_rate=claimed_rate,
+                high_quality_count=high_quality_count,
+                high_seo_count=high_seo_count
+            )
+            for condition, message in checks if condition
+        ]
+        
+        return recommendations if recommendations else [_DEFAULT_GMB_RECOMMENDATION]
@@ -3,13 +3,191 @@ MCP Tool pour l'endpoint Haloscan domains/gmbBacklinks/categories
 Permet d'analyser les catégories des backlinks Google My Business d'un domaine
 """
 
-from typing import Dict, Any, List, Optional
-from ...base import BaseMCPTool
+import asyncio
+import base64
+import heapq
+import math
+import re
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Any, List, Optional, Tuple
+from ...base import BaseMCPTool, tool_schema
+from ....cache import make_cache_key
 from ....dependencies import HaloscanClient
 from ....logging_config import get_logger
 
 logger = get_logger("domains_gmb_backlinks_categories_tool")
 
+
+@lru_cache(maxsize=256)
+def _compiled(pattern: str) -> "re.Pattern[str]":
+    """Compile une expression régulière de filtrage une seule fois par motif"""
+    return re.compile(pattern)
+
+
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern[str]":
+    """Construit une alternation précompilée à partir d'une liste de mots-clés littéraux"""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+# Mots-clés par industrie (l'ordre détermine la priorité de classification)
+_INDUSTRY_KEYWORDS = {
+    "retail": ["store", "shop", "retail", "boutique", "market", "mall"],
+    "food_beverage": ["restaurant", "cafe", "bar", "food", "bakery", "pizza", "coffee"],
+    "health_wellness": ["doctor", "clinic", "hospital", "pharmacy", "dentist", "medical", "health", "spa"],
+    "automotive": ["car", "auto", "garage", "mechanic", "tire", "vehicle"],
+    "beauty_personal": ["salon", "beauty", "barber", "spa", "nail", "cosmetic"],
+    "professional_services": ["lawyer", "accountant", "consultant", "agency", "office", "service"],
+    "home_garden": ["contractor", "plumber", "electrician", "landscaping", "home", "repair"],
+    "entertainment": ["theater", "cinema", "club", "entertainment", "game", "recreation"],
+    "education": ["school", "university", "education", "training", "course"],
+    "travel_hospitality": ["hotel", "motel", "travel", "tourism", "accommodation"],
+    "technology": ["computer", "tech", "software", "IT", "digital"],
+    "finance": ["bank", "insurance", "financial", "credit", "loan"],
+    "real_estate": ["real estate", "property", "realtor", "housing"],
+    "sports_fitness": ["gym", "fitness", "sport", "athletic", "yoga"]
+}
+
+_INDUSTRY_PATTERNS = [
+    (industry, _keyword_pattern(keywords)) for industry, keywords in _INDUSTRY_KEYWORDS.items()
+]
+
+# Catégories généralement très compétitives
+_HIGH_COMPETITION_PATTERN = _keyword_pattern([
+    "restaurant", "cafe", "bar", "hotel", "salon", "dentist", "lawyer",
+    "real estate", "insurance", "car dealer", "gym", "spa"
+])
+
+# Catégories de niche
+_NICHE_PATTERN = _keyword_pattern([
+    "specialty", "custom", "artisan", "boutique", "vintage", "organic",
+    "handmade", "luxury", "premium", "exclusive"
+])
+
+
+# Clé de tri en C, évite un appel de lambda par comparaison
+_BY_BUSINESS_COUNT = itemgetter("business_count")
+
+
+def _new_industry_bucket() -> Dict[str, Any]:
+    """Crée l'accumulateur d'une industrie pour _analyze_industries"""
+    return {"category_count": 0, "business_count": 0, "categories": []}
+
+
+def _push_top(heap: List[Tuple], size: int, entry: Tuple) -> None:
+    """Insère une entrée dans un tas borné (min-heap) ne conservant que les `size` plus grandes"""
+    if len(heap) < size:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+
+def _top_items(heap: List[Tuple]) -> List[Any]:
+    """Extrait les éléments d'un tas borné, du plus grand au plus petit"""
+    return [entry[-1] for entry in sorted(heap, reverse=True)]
+
+
+@lru_cache(maxsize=4096)
+def _classify_industry(category_lower: str) -> str:
+    """Classifie le type d'industrie d'un nom de catégorie normalisé (mémoïsé)"""
+    for industry, pattern in _INDUSTRY_PATTERNS:
+        if pattern.search(category_lower):
+            return industry
+    
+    return "other"
+
+
+@lru_cache(maxsize=4096)
+def _competition_flags(category_lower: str) -> Tuple[bool, bool]:
+    """Retourne (niche, très compétitive) pour un nom de catégorie normalisé (mémoïsé)"""
+    is_niche = _NICHE_PATTERN.search(category_lower) is not None
+    is_high_competition = _HIGH_COMPETITION_PATTERN.search(category_lower) is not None
+    return is_niche, is_high_competition
+
+
+# Définition OpenAI de l'outil, construite une seule fois à l'import
+_TOOL_DEFINITION: Dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "domains_gmb_backlinks_categories",
+        "description": "Analyze the categories distribution of Google My Business backlinks for a domain to understand the business types and industries linking to the domain.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "input": {
+                    "type": "string",
+                    "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["auto", "root", "domain", "url"],
+                    "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
+                    "default": "auto"
+                },
+                "lineCount": {
+                    "type": "integer",
+                    "description": "Maximum number of category results to analyze",
+                    "default": 100,
+                    "minimum": 1,
+                    "maximum": 500
+                },
+                "page": {
+                    "type": "integer",
+                    "description": "Page number for pagination (ignored when 'cursor' is provided)",
+                    "default": 1,
+                    "minimum": 1
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Opaque pagination cursor from a previous response (response_metadata.next_cursor), only valid with the same lineCount and filters"
+                },
+                "max_pages": {
+                    "type": "integer",
+                    "description": "Number of consecutive pages to fetch concurrently and analyze together",
+                    "default": 1,
+                    "minimum": 1,
+                    "maximum": 10
+                },
+                "min_businesses_per_category": {
+                    "type": "integer",
+                    "description": "Minimum number of businesses required for a category to be included in results",
+                    "default": 1,
+                    "minimum": 1
+                },
+                "category_filter": {
+                    "type": "string",
+                    "description": "Regular expression to filter specific categories"
+                },
+                "include_subcategories": {
+                    "type": "boolean",
+                    "description": "Whether to include subcategory analysis",
+                    "default": True
+                },
+                "rating_count_min": {
+                    "type": "integer",
+                    "description": "Minimum rating count for businesses to be included in category analysis",
+                    "minimum": 0
+                },
+                "rating_value_min": {
+                    "type": "number",
+                    "description": "Minimum rating value (0-5) for businesses to be included",
+                    "minimum": 0,
+                    "maximum": 5
+                },
+                "is_claimed": {
+                    "type": "boolean",
+                    "description": "Filter to include only claimed (true) or unclaimed (false) businesses in analysis"
+                }
+            },
+            "required": ["input"]
+        }
+    }
+}
+
+
+@tool_schema(_TOOL_DEFINITION)
 class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
     """Outil MCP pour l'analyse des catégories de backlinks Google My Business via l'API Haloscan"""
     
@@ -17,75 +195,6 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
         self.haloscan_client = haloscan_client
         self.tool_name = "domainsgmbbacklinkscategories"
         
-    def get_tool_definition(self) -> Dict[str, Any]:
-        """Définition OpenAI de l'outil pour l'analyse des catégories GMB"""
-        return {
-            "type": "function",
-            "function": {
-                "name": "domains_gmb_backlinks_categories",
-                "description": "Analyze the categories distribution of Google My Business backlinks for a domain to understand the business types and industries linking to the domain.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "input": {
-                            "type": "string",
-                            "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
-                        },
-                        "mode": {
-                            "type": "string",
-                            "enum": ["auto", "root", "domain", "url"],
-                            "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
-                            "default": "auto"
-                        },
-                        "lineCount": {
-                            "type": "integer",
-                            "description": "Maximum number of category results to analyze",
-                            "default": 100,
-                            "minimum": 1,
-                            "maximum": 500
-                        },
-                        "page": {
-                            "type": "integer",
-                            "description": "Page number for pagination",
-                            "default": 1,
-                            "minimum": 1
-                        },
-                        "min_businesses_per_category": {
-                            "type": "integer",
-                            "description": "Minimum number of businesses required for a category to be included in results",
-                            "default": 1,
-                            "minimum": 1
-                        },
-                        "category_filter": {
-                            "type": "string",
-                            "description": "Regular expression to filter specific categories"
-                        },
-                        "include_subcategories": {
-                            "type": "boolean",
-                            "description": "Whether to include subcategory analysis",
-                            "default": True
-                        },
-                        "rating_count_min": {
-                            "type": "integer",
-                            "description": "Minimum rating count for businesses to be included in category analysis",
-                            "minimum": 0
-                        },
-                        "rating_value_min": {
-                            "type": "number",
-                            "description": "Minimum rating value (0-5) for businesses to be included",
-                            "minimum": 0,
-                            "maximum": 5
-                        },
-                        "is_claimed": {
-                            "type": "boolean",
-                            "description": "Filter to include only claimed (true) or unclaimed (false) businesses in analysis"
-                        }
-                    },
-                    "required": ["input"]
-                }
-            }
-        }
-    
     async def execute(self, **kwargs) -> Dict[str, Any]:
         """Exécute l'analyse des catégories de backlinks GMB"""
         try:
@@ -95,12 +204,21 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
             if not input_domain:
                 return {"error": "Le paramètre 'input' (domaine) est requis"}
             
+            # Validation du filtre de catégories (compilé une seule fois par motif)
+            category_pattern = None
+            category_filter = kwargs.get("category_filter")
+            if category_filter:
+                try:
+                    category_pattern = _compiled(category_filter)
+                except re.error as e:
+                    return {"error": f"Expression régulière 'category_filter' invalide: {str(e)}"}
+            
             # Préparation des paramètres
+            line_count = kwargs.get("lineCount", 100)
             params = {
                 "input": input_domain,
                 "mode": kwargs.get("mode", "auto"),
-                "lineCount": kwargs.get("lineCount", 100),
-                "page": kwargs.get("page", 1)
+                "lineCount": line_count
             }
             
             # Paramètres d'analyse des catégories
@@ -116,9 +234,25 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
                 "rating_count_min", "rating_value_min", "is_claimed"
             ]
             
+            business_filters = {}
             for filter_param in optional_filters:
                 if filter_param in kwargs and kwargs[filter_param] is not None:
                     params[filter_param] = kwargs[filter_param]
+                    business_filters[filter_param] = kwargs[filter_param]
+            
+            # Pagination par curseur si fourni (décodé localement et lié à la requête), sinon par numéro de page
+            query_key = make_cache_key("domains/gmbBacklinks/categories", params)[:16]
+            cursor = kwargs.get("cursor")
+            if cursor:
+                decoded = self._decode_cursor(cursor)
+                if decoded is None:
+                    return {"error": "Le paramètre 'cursor' est invalide"}
+                page, cursor_line_count, cursor_query_key = decoded
+                if cursor_line_count != line_count or cursor_query_key != query_key:
+                    return {"error": "Le paramètre 'cursor' ne correspond pas à cette requête (lineCount ou filtres modifiés)"}
+                params["page"] = page
+            else:
+                params["page"] = kwargs.get("page", 1)
             
             logger.info(f"📊 Analyse des catégories GMB pour {input_domain}")
             
@@ -128,63 +262,175 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
             if not response:
                 return {"error": "Aucune réponse de l'API Haloscan"}
             
+            # Pages suivantes récupérées en parallèle si demandé
+            pages_fetched = 1
+            partial_errors = []
+            max_pages = kwargs.get("max_pages") or 1
+            if max_pages > 1:
+                response, pages_fetched, partial_errors = await self._fetch_following_pages(params, response, max_pages)
+            
+            # Curseur de la page suivant les pages récupérées (avant tout filtrage côté client)
+            next_cursor = self._next_cursor(response, params["page"], pages_fetched, line_count, query_key)
+            
             # Analyse et synthèse des résultats
-            return self._analyze_gmb_categories_results(response, input_domain)
+            analysis = self._analyze_gmb_categories_results(
+                response, input_domain, category_pattern, next_cursor, business_filters
+            )
+            if partial_errors:
+                analysis["partial_errors"] = partial_errors
+            return analysis
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'analyse des catégories GMB: {str(e)}")
             return {"error": f"Erreur lors de l'analyse des catégories GMB: {str(e)}"}
     
-    def _analyze_gmb_categories_results(self, response: Dict[str, Any], input_domain: str) -> Dict[str, Any]:
+    async def _fetch_following_pages(self, params: Dict[str, Any], response: Dict[str, Any],
+                                     max_pages: int) -> Tuple[Dict[str, Any], int, List[Dict[str, Any]]]:
+        """Récupère en parallèle les pages suivantes et les fusionne avec la première
+        
+        Retourne la réponse fusionnée (nouveau dict), le nombre de pages demandées et les erreurs
+        des pages en échec, dont les résultats sont simplement absents.
+        """
+        total_count = response.get("total_result_count", 0)
+        line_count = params["lineCount"]
+        first_page = params["page"]
+        
+        remaining_pages = math.ceil(total_count / line_count) - first_page if line_count else 0
+        extra_pages = max(0, min(max_pages - 1, remaining_pages))
+        if not extra_pages:
+            return response, 1, []
+        
+        pages = range(first_page + 1, first_page + 1 + extra_pages)
+        responses = await asyncio.gather(*[
+            self.haloscan_client.post_async("domains/gmbBacklinks/categories", {**params, "page": page})
+            for page in pages
+        ], return_exceptions=True)
+        
+        results = list(response.get("results", []))
+        partial_errors = []
+        for page, page_response in zip(pages, responses):
+            if isinstance(page_response, Exception):
+                logger.warning(f"⚠️ Page {page} des catégories GMB en échec: {str(page_response)}")
+                partial_errors.append({"page": page, "error": str(page_response)})
+            else:
+                results.extend((page_response or {}).get("results", []))
+        
+        return {**response, "results": results}, 1 + extra_pages, partial_errors
+    
+    def _analyze_gmb_categories_results(self, response: Dict[str, Any], input_domain: str,
+                                        category_pattern: Optional["re.Pattern[str]"] = None,
+                                        next_cursor: Optional[str] = None,
+                                        business_filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyse et synthèse des résultats des catégories GMB"""
         try:
             results = response.get("results", [])
             total_count = response.get("total_result_count", 0)
             
+            # Filtrage côté client des catégories avant l'analyse détaillée
+            if category_pattern is not None:
+                results = [r for r in results if category_pattern.search(r.get("category", ""))]
+            
             if not results:
                 return {
                     "summary": f"Aucune catégorie GMB trouvée pour {input_domain}",
                     "domain": input_domain,
                     "total_categories": 0,
-                    "categories": []
+                    "categories": [],
+                    "response_metadata": {
+                        "response_time": response.get("response_time", ""),
+                        "total_results": total_count,
+                        "next_cursor": next_cursor
+                    }
                 }
             
-            # Analyse détaillée des catégories
+            # Analyse détaillée des catégories (agrégats globaux cumulés en une seule passe)
             analyzed_categories = []
-            all_businesses = []
+            niche_categories = []
+            dominant_categories = []
+            total_businesses = 0
+            high_quality_count = 0
+            
+            # Top-K maintenus pendant la passe (départage : nombre d'entreprises puis ordre d'arrivée)
+            top_quality_heap = []
+            top_seo_heap = []
+            
+            # Filtres entreprises réappliqués côté client (filet de sécurité si l'API les ignore)
+            business_filters = business_filters or {}
+            rating_count_min = business_filters.get("rating_count_min")
+            rating_value_min = business_filters.get("rating_value_min")
+            claimed_filter = business_filters.get("is_claimed")
             
-            for category_data in results:
+            # Colonnes numériques de toutes les entreprises de la page
+            rating_values_all = array("d")
+            rating_counts_all = array("d")
+            claimed_all = bytearray()
+            complete_info_all = bytearray()
+            
+            for index, category_data in enumerate(results):
                 category_name = category_data.get("category", "")
                 business_count = category_data.get("business_count", 0)
                 businesses = category_data.get("businesses", [])
                 
                 # Analyse des entreprises de cette catégorie
                 category_businesses = []
-                total_ratings = 0
-                total_rating_count = 0
-                claimed_count = 0
+                start = len(claimed_all)
                 
                 for business in businesses:
-                    business_info = {
-                        "name": business.get("name", ""),
-                        "rating_count": business.get("rating_count", 0),
-                        "rating_value": business.get("rating_value", 0),
-                        "is_claimed": bool(business.get("is_claimed", 0)),
-                        "address": business.get("address", ""),
-                        "phone": business.get("phone", "")
-                    }
-                    category_businesses.append(business_info)
-                    all_businesses.append({**business_info, "category": category_name})
+                    # Chaque champ est lu une seule fois depuis la réponse API
+                    rating_count = business.get("rating_count", 0)
+                    rating_value = business.get("rating_value", 0)
+                    is_claimed = bool(business.get("is_claimed", 0))
                     
-                    if business_info["rating_value"] > 0:
-                        total_ratings += business_info["rating_value"]
-                        total_rating_count += 1
+                    if rating_count_min is not None and (rating_count or 0) < rating_count_min:
+                        continue
+                    if rating_value_min is not None and (rating_value or 0) < rating_value_min:
+                        continue
+                    if claimed_filter is not None and is_claimed != claimed_filter:
+                        continue
                     
-                    if business_info["is_claimed"]:
-                        claimed_count += 1
+                    address = business.get("address", "")
+                    phone = business.get("phone", "")
+                    category_businesses.append({
+                        "name": business.get("name", ""),
+                        "rating_count": rating_count,
+                        "rating_value": rating_value,
+                        "is_claimed": is_claimed,
+                        "address": address,
+                        "phone": phone
+                    })
+                    rating_values_all.append(rating_value or 0)
+                    rating_counts_all.append(rating_count or 0)
+                    claimed_all.append(is_claimed)
+                    complete_info_all.append(bool(phone and address))
+                
+                # Avec des filtres entreprises, les décomptes portent sur les entreprises retenues
+                reported_business_count = business_count
+                if business_filters:
+                    if not category_businesses:
+                        continue
+                    business_count = len(category_businesses)
+                
+                total_businesses += business_count
+                
+                # Agrégats de la catégorie sur sa tranche des colonnes (calculés une seule fois)
+                rated_counts = [count for value, count in zip(rating_values_all[start:], rating_counts_all[start:]) if value > 0]
+                rated_values = [value for value in rating_values_all[start:] if value > 0]
+                total_ratings = sum(rated_values)
+                total_rating_count = len(rated_values)
+                claimed_count = sum(claimed_all[start:])
+                
+                mean_rating = total_ratings / total_rating_count if total_rating_count else 0
+                mean_rating_count = sum(rated_counts) / total_rating_count if total_rating_count else 0
+                business_claimed_rate = claimed_count / len(category_businesses) * 100 if category_businesses else 0
+                complete_info_rate = sum(complete_info_all[start:]) / len(category_businesses) * 100 if category_businesses else 0
                 
-                # Calculs pour cette catégorie
-                avg_rating = round(total_ratings / total_rating_count, 2) if total_rating_count > 0 else 0
+                # La note moyenne arrondie est lue dans l'évaluation de qualité plutôt que recalculée
+                category_quality = self._assess_category_quality(
+                    category_businesses, mean_rating, mean_rating_count, business_claimed_rate, total_rating_count,
+                    complete_info_rate
+                )
+                avg_rating = category_quality["average_rating"]
+                # Taux rapporté au nombre d'entreprises de la catégorie (retenues si des filtres sont actifs)
                 claimed_rate = round((claimed_count / business_count) * 100, 1) if business_count > 0 else 0
                 
                 category_analysis = {
@@ -194,50 +440,66 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
                     "average_rating": avg_rating,
                     "claimed_rate": claimed_rate,
                     "businesses": category_businesses,
-                    "category_quality": self._assess_category_quality(category_businesses),
+                    "category_quality": category_quality,
                     "industry_type": self._classify_industry_type(category_name),
-                    "local_seo_value": self._calculate_category_seo_value(category_businesses, business_count),
+                    "local_seo_value": self._calculate_category_seo_value(
+                        category_businesses, business_count, mean_rating, mean_rating_count, total_rating_count
+                    ),
                     "competitiveness": self._assess_category_competitiveness(category_name, business_count)
                 }
+                if business_filters:
+                    category_analysis["reported_business_count"] = reported_business_count
                 analyzed_categories.append(category_analysis)
+                
+                tiebreak = (business_count, -index)
+                _push_top(top_quality_heap, 5, (category_analysis["category_quality"]["score"], *tiebreak, category_analysis))
+                _push_top(top_seo_heap, 5, (category_analysis["local_seo_value"], *tiebreak, category_analysis))
+                
+                if category_analysis["category_quality"]["level"] in ["excellent", "good"]:
+                    high_quality_count += 1
+                
+                # Catégories émergentes et niches
+                if business_count <= 3 and avg_rating >= 4.0:
+                    niche_categories.append(category_analysis)
+                if category_analysis["percentage_of_total"] >= 10:
+                    dominant_categories.append(category_analysis)
             
             # Tri par nombre d'entreprises
-            analyzed_categories.sort(key=lambda x: x["business_count"], reverse=True)
+            analyzed_categories.sort(key=_BY_BUSINESS_COUNT, reverse=True)
+            niche_categories.sort(key=_BY_BUSINESS_COUNT, reverse=True)
+            dominant_categories.sort(key=_BY_BUSINESS_COUNT, reverse=True)
             
             # Analyse des industries
             industry_analysis = self._analyze_industries(analyzed_categories)
             
             # Analyse de la diversité
-            diversity_analysis = self._analyze_category_diversity(analyzed_categories, total_count)
+            diversity_index, herfindahl_index = self._calculate_concentration_indices(analyzed_categories)
+            diversity_analysis = self._analyze_category_diversity(analyzed_categories, total_count, herfindahl_index)
             
             # Top catégories par différents critères
             top_by_count = analyzed_categories[:10]
-            top_by_quality = sorted(analyzed_categories, key=lambda x: x["category_quality"]["score"], reverse=True)[:5]
-            top_by_seo_value = sorted(analyzed_categories, key=lambda x: x["local_seo_value"], reverse=True)[:5]
-            
-            # Catégories émergentes et niches
-            niche_categories = [cat for cat in analyzed_categories if cat["business_count"] <= 3 and cat["average_rating"] >= 4.0]
-            dominant_categories = [cat for cat in analyzed_categories if cat["percentage_of_total"] >= 10]
+            top_by_quality = _top_items(top_quality_heap)
+            top_by_seo_value = _top_items(top_seo_heap)
             
             # Opportunités d'amélioration
             improvement_opportunities = self._identify_improvement_opportunities(analyzed_categories)
             
             # Statistiques globales
+            rated_values_all = [value for value in rating_values_all if value > 0]
             global_stats = {
                 "total_categories": len(analyzed_categories),
-                "total_businesses_analyzed": sum(cat["business_count"] for cat in analyzed_categories),
-                "average_businesses_per_category": round(sum(cat["business_count"] for cat in analyzed_categories) / len(analyzed_categories), 1) if analyzed_categories else 0,
+                "total_businesses_analyzed": total_businesses,
+                "average_businesses_per_category": round(total_businesses / len(analyzed_categories), 1) if analyzed_categories else 0,
                 "most_common_category": analyzed_categories[0]["name"] if analyzed_categories else None,
                 "category_concentration": {
                     "top_3_percentage": sum(cat["percentage_of_total"] for cat in analyzed_categories[:3]),
                     "top_5_percentage": sum(cat["percentage_of_total"] for cat in analyzed_categories[:5]),
-                    "diversity_index": self._calculate_diversity_index(analyzed_categories)
+                    "diversity_index": diversity_index
                 },
                 "quality_metrics": {
-                    "average_rating_all": round(sum(b["rating_value"] for b in all_businesses if b["rating_value"] > 0) / 
-                                              len([b for b in all_businesses if b["rating_value"] > 0]), 2) if all_businesses else 0,
-                    "claimed_rate_all": round(sum(1 for b in all_businesses if b["is_claimed"]) / len(all_businesses) * 100, 1) if all_businesses else 0,
-                    "categories_with_high_quality": len([cat for cat in analyzed_categories if cat["category_quality"]["level"] in ["excellent", "good"]])
+                    "average_rating_all": round(sum(rated_values_all) / len(rated_values_all), 2) if rated_values_all else 0,
+                    "claimed_rate_all": round(sum(claimed_all) / len(claimed_all) * 100, 1) if claimed_all else 0,
+                    "categories_with_high_quality": high_quality_count
                 }
             }
             
@@ -257,7 +519,8 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
                 "recommendations": self._generate_category_recommendations(analyzed_categories, global_stats),
                 "response_metadata": {
                     "response_time": response.get("response_time", ""),
-                    "total_results": total_count
+                    "total_results": total_count,
+                    "next_cursor": next_cursor
                 }
             }
             
@@ -265,16 +528,51 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
             logger.error(f"❌ Erreur lors de l'analyse des résultats: {str(e)}")
             return {"error": f"Erreur lors de l'analyse des résultats: {str(e)}"}
     
-    def _assess_category_quality(self, businesses: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Évalue la qualité d'une catégorie basée sur ses entreprises"""
+    @staticmethod
+    def _next_cursor(response: Dict[str, Any], first_page: int, pages_fetched: int, line_count: int,
+                     query_key: str) -> Optional[str]:
+        """Curseur opaque désignant la page suivant les pages récupérées (None s'il n'y en a plus)
+        
+        Le curseur porte aussi le lineCount et l'empreinte des paramètres de la requête, pour être
+        refusé s'il est réutilisé avec une autre requête.
+        """
+        next_page = first_page + pages_fetched
+        total_count = response.get("total_result_count") or 0
+        if total_count:
+            has_more = total_count > (next_page - 1) * line_count
+        else:
+            # Total inconnu : une page suivante est possible si les pages récupérées sont pleines
+            has_more = len(response.get("results") or []) >= pages_fetched * line_count
+        if not has_more:
+            return None
+        
+        payload = f"page:{next_page}:{line_count}:{query_key}"
+        return base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Optional[Tuple[int, int, str]]:
+        """Numéro de page, lineCount et empreinte de requête encodés dans un curseur (None si invalide)"""
+        try:
+            prefix, page, line_count, query_key = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii").split(":")
+            page_number = int(page)
+            line_count_value = int(line_count)
+        except (ValueError, UnicodeError):
+            return None
+        
+        if prefix != "page" or page_number < 1:
+            return None
+        return page_number, line_count_value, query_key
+    
+    def _assess_category_quality(self, businesses: List[Dict[str, Any]], avg_rating: float, avg_count: float,
+                                 claimed_rate: float, rated_count: int, complete_info: float) -> Dict[str, Any]:
+        """Évalue la qualité d'une catégorie à partir des agrégats précalculés de ses entreprises"""
         if not businesses:
-            return {"level": "poor", "score": 0, "factors": []}
+            return {"level": "poor", "score": 0, "factors": [], "claimed_rate": 0, "average_rating": 0}
         
         score = 0
         factors = []
         
         # Taux de revendication
-        claimed_rate = sum(1 for b in businesses if b["is_claimed"]) / len(businesses) * 100
         if claimed_rate >= 80:
             score += 25
             factors.append("Excellent taux de revendication")
@@ -283,11 +581,7 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
             factors.append("Bon taux de revendication")
         
         # Qualité des avis
-        rated_businesses = [b for b in businesses if b["rating_value"] > 0]
-        if rated_businesses:
-            avg_rating = sum(b["rating_value"] for b in rated_businesses) / len(rated_businesses)
-            avg_count = sum(b["rating_count"] for b in rated_businesses) / len(rated_businesses)
-            
+        if rated_count:
             if avg_rating >= 4.5:
                 score += 30
                 factors.append("Excellentes notes moyennes")
@@ -303,7 +597,6 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
                 factors.append("Volume d'avis correct")
         
         # Complétude des informations
-        complete_info = sum(1 for b in businesses if b["phone"] and b["address"]) / len(businesses) * 100
         if complete_info >= 80:
             score += 15
             factors.append("Informations complètes")
@@ -334,38 +627,16 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
             "score": score,
             "factors": factors,
             "claimed_rate": round(claimed_rate, 1),
-            "average_rating": round(sum(b["rating_value"] for b in rated_businesses) / len(rated_businesses), 2) if rated_businesses else 0
+            "average_rating": round(avg_rating, 2) if rated_count else 0
         }
     
     def _classify_industry_type(self, category_name: str) -> str:
         """Classifie le type d'industrie d'une catégorie"""
-        category_lower = category_name.lower()
-        
-        industry_mapping = {
-            "retail": ["store", "shop", "retail", "boutique", "market", "mall"],
-            "food_beverage": ["restaurant", "cafe", "bar", "food", "bakery", "pizza", "coffee"],
-            "health_wellness": ["doctor", "clinic", "hospital", "pharmacy", "dentist", "medical", "health", "spa"],
-            "automotive": ["car", "auto", "garage", "mechanic", "tire", "vehicle"],
-            "beauty_personal": ["salon", "beauty", "barber", "spa", "nail", "cosmetic"],
-            "professional_services": ["lawyer", "accountant", "consultant", "agency", "office", "service"],
-            "home_garden": ["contractor", "plumber", "electrician", "landscaping", "home", "repair"],
-            "entertainment": ["theater", "cinema", "club", "entertainment", "game", "recreation"],
-            "education": ["school", "university", "education", "training", "course"],
-            "travel_hospitality": ["hotel", "motel", "travel", "tourism", "accommodation"],
-            "technology": ["computer", "tech", "software", "IT", "digital"],
-            "finance": ["bank", "insurance", "financial", "credit", "loan"],
-            "real_estate": ["real estate", "property", "realtor", "housing"],
-            "sports_fitness": ["gym", "fitness", "sport", "athletic", "yoga"]
-        }
-        
-        for industry, keywords in industry_mapping.items():
-            if any(keyword in category_lower for keyword in keywords):
-                return industry
-        
-        return "other"
+        return _classify_industry(category_name.strip().lower())
     
-    def _calculate_category_seo_value(self, businesses: List[Dict[str, Any]], business_count: int) -> float:
-        """Calcule la valeur SEO local d'une catégorie"""
+    def _calculate_category_seo_value(self, businesses: List[Dict[str, Any]], business_count: int,
+                                      avg_rating: float, avg_count: float, rated_count: int) -> float:
+        """Calcule la valeur SEO local d'une catégorie à partir des agrégats précalculés"""
         if not businesses:
             return 0
         
@@ -375,11 +646,7 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
         score += min(business_count * 2, 30)  # Max 30 points
         
         # Qualité moyenne des avis
-        rated_businesses = [b for b in businesses if b["rating_value"] > 0]
-        if rated_businesses:
-            avg_rating = sum(b["rating_value"] for b in rated_businesses) / len(rated_businesses)
-            avg_count = sum(b["rating_count"] for b in rated_businesses) / len(rated_businesses)
-            
+        if rated_count:
             score += avg_rating * 10  # Max 50 points
             score += min(avg_count, 20)  # Max 20 points
         
@@ -387,25 +654,8 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
     
     def _assess_category_competitiveness(self, category_name: str, business_count: int) -> str:
         """Évalue la compétitivité d'une catégorie"""
-        # Catégories généralement très compétitives
-        high_competition = [
-            "restaurant", "cafe", "bar", "hotel", "salon", "dentist", "lawyer",
-            "real estate", "insurance", "car dealer", "gym", "spa"
-        ]
-        
-        # Catégories de niche
-        niche_categories = [
-            "specialty", "custom", "artisan", "boutique", "vintage", "organic",
-            "handmade", "luxury", "premium", "exclusive"
-        ]
-        
-        category_lower = category_name.lower()
-        
-        # Vérification des mots-clés de niche
-        is_niche = any(keyword in category_lower for keyword in niche_categories)
-        
-        # Vérification des catégories très compétitives
-        is_high_competition = any(keyword in category_lower for keyword in high_competition)
+        # Mots-clés de niche / catégories très compétitives
+        is_niche, is_high_competition = _competition_flags(category_name.strip().lower())
         
         if is_niche:
             return "niche"
@@ -422,32 +672,25 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
     
     def _analyze_industries(self, categories: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyse la distribution par industrie"""
-        industry_distribution = {}
+        industry_distribution = defaultdict(_new_industry_bucket)
         
         for category in categories:
-            industry = category["industry_type"]
-            if industry not in industry_distribution:
-                industry_distribution[industry] = {
-                    "category_count": 0,
-                    "business_count": 0,
-                    "categories": []
-                }
-            
-            industry_distribution[industry]["category_count"] += 1
-            industry_distribution[industry]["business_count"] += category["business_count"]
-            industry_distribution[industry]["categories"].append(category["name"])
+            bucket = industry_distribution[category["industry_type"]]
+            bucket["category_count"] += 1
+            bucket["business_count"] += category["business_count"]
+            bucket["categories"].append(category["name"])
         
-        # Tri par nombre d'entreprises
+        # Tri par nombre d'entreprises (tri stable : la première industrie est la dominante)
         sorted_industries = dict(sorted(industry_distribution.items(), 
                                      key=lambda x: x[1]["business_count"], reverse=True))
         
         return {
             "total_industries": len(industry_distribution),
             "distribution": sorted_industries,
-            "dominant_industry": max(industry_distribution.items(), key=lambda x: x[1]["business_count"])[0] if industry_distribution else None
+            "dominant_industry": next(iter(sorted_industries)) if sorted_industries else None
         }
     
-    def _analyze_category_diversity(self, categories: List[Dict[str, Any]], total_count: int) -> Dict[str, Any]:
+    def _analyze_category_diversity(self, categories: List[Dict[str, Any]], total_count: int, herfindahl_index: float) -> Dict[str, Any]:
         """Analyse la diversité des catégories"""
         if not categories:
             return {"diversity_level": "none"}
@@ -471,32 +714,29 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
             "concentration_metrics": {
                 "top_3_percentage": round(top_3_percentage, 1),
                 "top_5_percentage": round(top_5_percentage, 1),
-                "herfindahl_index": self._calculate_herfindahl_index(categories)
+                "herfindahl_index": herfindahl_index
             },
             "long_tail_categories": len([cat for cat in categories if cat["percentage_of_total"] < 2])
         }
     
-    def _calculate_diversity_index(self, categories: List[Dict[str, Any]]) -> float:
-        """Calcule un indice de diversité Simpson"""
+    def _calculate_concentration_indices(self, categories: List[Dict[str, Any]]) -> Tuple[float, float]:
+        """Calcule en une passe l'indice de diversité Simpson et l'indice de Herfindahl-Hirschman"""
         if not categories:
-            return 0
+            return 0, 0
         
-        total = sum(cat["business_count"] for cat in categories)
-        if total == 0:
-            return 0
-        
-        simpson_index = sum((cat["business_count"] / total) ** 2 for cat in categories)
-        diversity_index = 1 - simpson_index
+        total = 0
+        sum_squared_counts = 0
+        hhi = 0
+        for cat in categories:
+            count = cat["business_count"]
+            percentage = cat["percentage_of_total"]
+            total += count
+            sum_squared_counts += count * count
+            hhi += percentage * percentage
         
-        return round(diversity_index, 3)
-    
-    def _calculate_herfindahl_index(self, categories: List[Dict[str, Any]]) -> float:
-        """Calcule l'indice de Herfindahl-Hirschman pour la concentration"""
-        if not categories:
-            return 0
+        diversity_index = round(1 - sum_squared_counts / (total * total), 3) if total else 0
         
-        hhi = sum(cat["percentage_of_total"] ** 2 for cat in categories)
-        return round(hhi, 1)
+        return diversity_index, round(hhi, 1)
     
     def _identify_improvement_opportunities(self, categories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Identifie les opportunités d'amélioration par catégorie"""
@@ -531,7 +771,7 @@ class DomainsGmbBacklinksCategoresTool(BaseMCPTool):
                     "priority": "high" if category["percentage_of_total"] > 10 else "medium" if category["percentage_of_total"] > 5 else "low"
                 })
         
-        return sorted(opportunities, key=lambda x: x["business_count"], reverse=True)
+        return sorted(opportunities, key=_BY_BUSINESS_COUNT, reverse=True)
     
     def _generate_category_recommendations(self, categories: List[Dict[str, Any]], stats: Dict[str, Any]) -> List[str]:
         """Génère des recommandations basées sur l'analyse des catégories"""
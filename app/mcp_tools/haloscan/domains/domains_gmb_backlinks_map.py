@@ -3,13 +3,225 @@ MCP Tool pour l'endpoint Haloscan domains/gmbBacklinks/map
 Permet d'obtenir une visualisation cartographique des backlinks Google My Business d'un domaine
 """
 
-from typing import Dict, Any, List, Optional
-from ...base import BaseMCPTool
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from ...base import BaseMCPTool, tool_schema
+from ....cache import TTLCache, make_cache_key
+from ....config import Config
 from ....dependencies import HaloscanClient
 from ....logging_config import get_logger
 
 logger = get_logger("domains_gmb_backlinks_map_tool")
 
+# Analyses de carte déjà calculées, indexées par (domaine, paramètres de requête)
+_ANALYSIS_CACHE = TTLCache(ttl=Config.HALOSCAN_CACHE_TTL)
+
+# Rayon des clusters géographiques (en degrés, environ 1km) et cellules voisines de la grille
+_CLUSTER_RADIUS = 0.01
+_NEIGHBOUR_CELLS = tuple((d_lat, d_lng) for d_lat in (-1, 0, 1) for d_lng in (-1, 0, 1))
+# Nombre de noms d'entreprises donnés en exemple par cluster (la liste complète est dans map_points)
+_CLUSTER_SAMPLE_SIZE = 5
+
+# Paramètres de carte et filtres optionnels transmis tels quels à l'API
+_MAP_PARAMS = ("map_zoom", "map_center_lat", "map_center_lng")
+_OPTIONAL_FILTERS = ("rating_count_min", "rating_value_min", "is_claimed", "categories_include")
+
+# Paliers d'amplitude (en degrés, bornes exclues) -> zoom et étendue géographique
+_ZOOM_THRESHOLDS = (0.05, 0.1, 0.5, 1, 2, 5, 10)
+_ZOOM_VALUES = (14, 13, 12, 10, 9, 8, 7, 6)
+_SPREAD_THRESHOLDS = (0.01, 0.1, 1, 5)
+_SPREAD_VALUES = ("very_narrow", "narrow", "medium", "wide", "very_wide")
+
+# Paliers de densité (points par km², bornes exclues)
+_DENSITY_THRESHOLDS = (1, 10, 50, 100)
+_DENSITY_LEVELS = ("very_low", "low", "medium", "high", "very_high")
+
+# Paliers de priorité des marqueurs (bornes incluses) -> points attribués
+_RATING_COUNT_THRESHOLDS = (5, 20, 50)
+_RATING_COUNT_SCORES = (0, 10, 15, 25)
+_RATING_VALUE_THRESHOLDS = (3.5, 4.0, 4.5)
+_RATING_VALUE_SCORES = (0, 10, 15, 20)
+_PHOTOS_THRESHOLDS = (5, 10)
+_PHOTOS_SCORES = (0, 10, 15)
+
+# Messages de recommandation (gabarits formatés uniquement lorsqu'ils s'appliquent)
+_NO_LOCATION_RECOMMENDATION = "Aucune donnée géographique disponible pour la carte"
+_DEFAULT_MAP_RECOMMENDATION = "🗺️ Carte GMB générée avec succès"
+_LOW_COVERAGE_TEMPLATE = "📍 Seulement {location_coverage}% des entreprises ont des coordonnées, complétez les données"
+_HIGH_COVERAGE_MESSAGE = "🎯 Excellente couverture géographique des données"
+_DENSE_MAP_MESSAGE = "🗺️ Utilisez le clustering de marqueurs pour éviter la surcharge visuelle"
+_SPARSE_MAP_MESSAGE = "📌 Densité faible, zoom plus important recommandé"
+_MANY_CLUSTERS_TEMPLATE = "🎯 {cluster_count} zones géographiques identifiées, analysez chaque cluster"
+_SINGLE_CLUSTER_MESSAGE = "📍 Concentration géographique forte, opportunité de domination locale"
+_VERY_WIDE_MESSAGE = "🌍 Couverture géographique très large, segmentez par région"
+_VERY_NARROW_MESSAGE = "🎯 Zone géographique concentrée, excellent pour le SEO local"
+_HIGH_PRIORITY_TEMPLATE = "⭐ {high_priority_count} entreprise(s) prioritaire(s) à mettre en avant sur la carte"
+_HEAT_MAP_MESSAGE = "⚡ Activez la carte de chaleur pour une meilleure visualisation"
+_FILTERS_MESSAGE = "🔧 Implémentez des filtres interactifs (note, statut, catégorie)"
+
+
+class _MapPoint(NamedTuple):
+    """Point de carte compact utilisé pendant l'analyse, converti en dict JSON à la fin"""
+    cid: str
+    name: str
+    address: str
+    lat: float
+    lng: float
+    rating_count: int
+    rating_value: float
+    categories: str
+    is_claimed: bool
+    priority: int
+    cluster_id: str
+
+
+def _cluster_points(lats: array, lngs: array, cluster_radius: float) -> List[int]:
+    """Regroupe les points en clusters géographiques et retourne l'indice de cluster de chaque point
+    
+    Les points sont parcourus dans l'ordre : chacun rejoint le premier cluster créé dont le centre
+    est à portée (le centre est alors recalculé), sinon il ouvre un nouveau cluster. Les centres
+    sont indexés dans une grille de cellules de la taille du rayon, si bien que seuls les
+    clusters des 9 cellules voisines d'un point sont testés.
+    
+    Fonction autonome sur des colonnes de flottants : tout l'état est en variables locales.
+    """
+    floor = math.floor
+    radius_sq = cluster_radius * cluster_radius
+    center_lats = array("d")
+    center_lngs = array("d")
+    counts = []
+    cells = []
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    grid_get = grid.get
+    labels = []
+    
+    for lat, lng in zip(lats, lngs):
+        cell_lat = floor(lat / cluster_radius)
+        cell_lng = floor(lng / cluster_radius)
+        candidates = sorted(
+            label
+            for d_lat, d_lng in _NEIGHBOUR_CELLS
+            for label in grid_get((cell_lat + d_lat, cell_lng + d_lng), ())
+        )
+        
+        for label in candidates:
+            # Comparaison des distances au carré : pas de racine carrée par candidat
+            delta_lat = lat - center_lats[label]
+            delta_lng = lng - center_lngs[label]
+            if delta_lat * delta_lat + delta_lng * delta_lng <= radius_sq:
+                # Mettre à jour le centre du cluster (moyenne incrémentale)
+                count = counts[label] + 1
+                counts[label] = count
+                center_lat = center_lats[label]
+                center_lng = center_lngs[label]
+                center_lat += (lat - center_lat) / count
+                center_lng += (lng - center_lng) / count
+                center_lats[label] = center_lat
+                center_lngs[label] = center_lng
+                
+                # Le centre a pu changer de cellule : mise à jour de l'index
+                cell = (floor(center_lat / cluster_radius), floor(center_lng / cluster_radius))
+                if cell != cells[label]:
+                    grid[cells[label]].remove(label)
+                    grid.setdefault(cell, []).append(label)
+                    cells[label] = cell
+                break
+        else:
+            # Créer un nouveau cluster
+            label = len(counts)
+            center_lats.append(lat)
+            center_lngs.append(lng)
+            counts.append(1)
+            cells.append((cell_lat, cell_lng))
+            grid.setdefault((cell_lat, cell_lng), []).append(label)
+        
+        labels.append(label)
+    
+    return labels
+
+
+# Définition OpenAI de l'outil, construite une seule fois à l'import
+_TOOL_DEFINITION: Dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "domains_gmb_backlinks_map",
+        "description": "Generate a map visualization of Google My Business backlinks for a domain, showing geographic distribution of local businesses linking to the domain.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "input": {
+                    "type": "string",
+                    "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
+                },
+                "inputs": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Additional domains or URLs to map together with 'input'. Requests are sent concurrently and maps are returned per domain",
+                    "maxItems": 10
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["auto", "root", "domain", "url"],
+                    "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
+                    "default": "auto"
+                },
+                "lineCount": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return for the map",
+                    "default": 50,
+                    "minimum": 1,
+                    "maximum": 200
+                },
+                "page": {
+                    "type": "integer",
+                    "description": "Page number for pagination",
+                    "default": 1,
+                    "minimum": 1
+                },
+                "map_zoom": {
+                    "type": "integer",
+                    "description": "Zoom level for the map visualization",
+                    "default": 10,
+                    "minimum": 1,
+                    "maximum": 20
+                },
+                "map_center_lat": {
+                    "type": "number",
+                    "description": "Latitude for map center (auto-calculated if not provided)"
+                },
+                "map_center_lng": {
+                    "type": "number",
+                    "description": "Longitude for map center (auto-calculated if not provided)"
+                },
+                "rating_count_min": {
+                    "type": "integer",
+                    "description": "Minimum rating count filter for businesses to show on map",
+                    "minimum": 0
+                },
+                "rating_value_min": {
+                    "type": "number",
+                    "description": "Minimum rating value filter (0-5) for businesses to show on map",
+                    "minimum": 0,
+                    "maximum": 5
+                },
+                "is_claimed": {
+                    "type": "boolean",
+                    "description": "Filter to show only claimed (true) or unclaimed (false) businesses on map"
+                },
+                "categories_include": {
+                    "type": "string",
+                    "description": "Regular expression for categories to be included on the map"
+                }
+            },
+            "required": ["input"]
+        }
+    }
+}
+
+
+@tool_schema(_TOOL_DEFINITION)
 class DomainsGmbBacklinksMapTool(BaseMCPTool):
     """Outil MCP pour la visualisation cartographique des backlinks Google My Business via l'API Haloscan"""
     
@@ -17,79 +229,6 @@ class DomainsGmbBacklinksMapTool(BaseMCPTool):
         self.haloscan_client = haloscan_client
         self.tool_name = "domainsgmbbacklinksmap"
         
-    def get_tool_definition(self) -> Dict[str, Any]:
-        """Définition OpenAI de l'outil pour la carte des backlinks GMB"""
-        return {
-            "type": "function",
-            "function": {
-                "name": "domains_gmb_backlinks_map",
-                "description": "Generate a map visualization of Google My Business backlinks for a domain, showing geographic distribution of local businesses linking to the domain.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "input": {
-                            "type": "string",
-                            "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
-                        },
-                        "mode": {
-                            "type": "string",
-                            "enum": ["auto", "root", "domain", "url"],
-                            "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
-                            "default": "auto"
-                        },
-                        "lineCount": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return for the map",
-                            "default": 50,
-                            "minimum": 1,
-                            "maximum": 200
-                        },
-                        "page": {
-                            "type": "integer",
-                            "description": "Page number for pagination",
-                            "default": 1,
-                            "minimum": 1
-                        },
-                        "map_zoom": {
-                            "type": "integer",
-                            "description": "Zoom level for the map visualization",
-                            "default": 10,
-                            "minimum": 1,
-                            "maximum": 20
-                        },
-                        "map_center_lat": {
-                            "type": "number",
-                            "description": "Latitude for map center (auto-calculated if not provided)"
-                        },
-                        "map_center_lng": {
-                            "type": "number",
-                            "description": "Longitude for map center (auto-calculated if not provided)"
-                        },
-                        "rating_count_min": {
-                            "type": "integer",
-                            "description": "Minimum rating count filter for businesses to show on map",
-                            "minimum": 0
-                        },
-                        "rating_value_min": {
-                            "type": "number",
-                            "description": "Minimum rating value filter (0-5) for businesses to show on map",
-                            "minimum": 0,
-                            "maximum": 5
-                        },
-                        "is_claimed": {
-                            "type": "boolean",
-                            "description": "Filter to show only claimed (true) or unclaimed (false) businesses on map"
-                        },
-                        "categories_include": {
-                            "type": "string",
-                            "description": "Regular expression for categories to be included on the map"
-                        }
-                    },
-                    "required": ["input"]
-                }
-            }
-        }
-    
     async def execute(self, **kwargs) -> Dict[str, Any]:
         """Exécute la génération de la carte des backlinks GMB"""
         try:
@@ -99,44 +238,88 @@ class DomainsGmbBacklinksMapTool(BaseMCPTool):
             if not input_domain:
                 return {"error": "Le paramètre 'input' (domaine) est requis"}
             
-            # Préparation des paramètres
-            params = {
-                "input": input_domain,
-                "mode": kwargs.get("mode", "auto"),
-                "lineCount": kwargs.get("lineCount", 50),
-                "page": kwargs.get("page", 1)
-            }
-            
-            # Paramètres de carte
-            map_params = ["map_zoom", "map_center_lat", "map_center_lng"]
-            for param in map_params:
-                if param in kwargs and kwargs[param] is not None:
-                    params[param] = kwargs[param]
-            
-            # Filtres optionnels
-            optional_filters = [
-                "rating_count_min", "rating_value_min", "is_claimed", "categories_include"
-            ]
-            
-            for filter_param in optional_filters:
-                if filter_param in kwargs and kwargs[filter_param] is not None:
-                    params[filter_param] = kwargs[filter_param]
-            
-            logger.info(f"🗺️ Génération de la carte GMB pour {input_domain}")
+            # Plusieurs domaines : cartes générées en parallèle
+            extra_domains = [domain.strip() for domain in kwargs.get("inputs") or [] if domain and domain.strip()]
+            if extra_domains:
+                return await self._execute_many([input_domain, *extra_domains], kwargs)
             
-            # Appel à l'API Haloscan
-            response = await self.haloscan_client.post_async("domains/gmbBacklinks/map", params)
-            
-            if not response:
-                return {"error": "Aucune réponse de l'API Haloscan"}
-            
-            # Analyse et synthèse des résultats
-            return self._analyze_gmb_map_results(response, input_domain)
+            return await self._execute_one(input_domain, kwargs)
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de la génération de la carte GMB: {str(e)}")
             return {"error": f"Erreur lors de la génération de la carte GMB: {str(e)}"}
     
+    async def _execute_one(self, input_domain: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Génère la carte d'un domaine, depuis le cache d'analyses si possible"""
+        params = self._build_params(input_domain, kwargs)
+        
+        cache_key = make_cache_key(input_domain, params)
+        cached = _ANALYSIS_CACHE.get(cache_key)
+        if cached is not None:
+            logger.info(f"♻️ Carte GMB servie depuis le cache pour {input_domain}")
+            return {**cached}
+        
+        logger.info(f"🗺️ Génération de la carte GMB pour {input_domain}")
+        
+        # Appel à l'API Haloscan
+        response = await self.haloscan_client.post_async("domains/gmbBacklinks/map", params)
+        
+        if not response:
+            return {"error": "Aucune réponse de l'API Haloscan"}
+        
+        # Analyse et synthèse des résultats
+        return self._analyze_and_cache(response, input_domain, cache_key)
+    
+    def _build_params(self, input_domain: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Prépare les paramètres de la requête API pour un domaine"""
+        params = {
+            "input": input_domain,
+            "mode": kwargs.get("mode", "auto"),
+            "lineCount": kwargs.get("lineCount", 50),
+            "page": kwargs.get("page", 1)
+        }
+        
+        # Paramètres de carte
+        for param in _MAP_PARAMS:
+            if param in kwargs and kwargs[param] is not None:
+                params[param] = kwargs[param]
+        
+        # Filtres optionnels
+        for filter_param in _OPTIONAL_FILTERS:
+            if filter_param in kwargs and kwargs[filter_param] is not None:
+                params[filter_param] = kwargs[filter_param]
+        
+        return params
+    
+    def _analyze_and_cache(self, response: Dict[str, Any], input_domain: str, cache_key: str) -> Dict[str, Any]:
+        """Analyse une réponse de l'API et met le résultat en cache s'il est valide
+        
+        L'analyse en cache est partagée : chaque appelant reçoit une copie de son premier niveau.
+        """
+        result = self._analyze_gmb_map_results(response, input_domain)
+        if "error" not in result:
+            _ANALYSIS_CACHE.set(cache_key, result)
+            return {**result}
+        return result
+    
+    async def _execute_many(self, domains: List[str], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Génère les cartes de plusieurs domaines en parallèle (concurrence bornée)"""
+        domains = list(dict.fromkeys(domains))
+        
+        logger.info(f"🗺️ Génération des cartes GMB pour {len(domains)} domaine(s)")
+        
+        results_by_domain = await self._execute_per_domain(
+            domains,
+            lambda domain: self._execute_one(domain, kwargs),
+            "Erreur lors de la génération de la carte GMB"
+        )
+        
+        return {
+            "summary": f"Cartes GMB générées pour {len(domains)} domaine(s)",
+            "domains": domains,
+            "results_by_domain": results_by_domain
+        }
+    
     def _analyze_gmb_map_results(self, response: Dict[str, Any], input_domain: str) -> Dict[str, Any]:
         """Analyse et synthèse des résultats de la carte GMB"""
         try:
@@ -152,47 +335,92 @@ class DomainsGmbBacklinksMapTool(BaseMCPTool):
                     "businesses_on_map": 0
                 }
             
-            # Analyse des points sur la carte
-            map_points = []
-            geographic_clusters = {}
+            # Extraction des entreprises géolocalisées (coordonnées conservées en colonnes contiguës)
+            located = []
+            lats = array("d")
+            lngs = array("d")
+            rating_counts = []
+            rating_values = []
+            photos = []
+            claimed = bytearray()
+            contact_points = []
             
             for business in results:
                 lat = business.get("latitude")
                 lng = business.get("longitude")
                 
                 if lat is not None and lng is not None:
-                    point = {
-                        "cid": business.get("cid", ""),
-                        "name": business.get("name", ""),
-                        "address": business.get("address", ""),
-                        "coordinates": {"lat": lat, "lng": lng},
-                        "rating": {
-                            "count": business.get("rating_count", 0),
-                            "value": business.get("rating_value", 0)
-                        },
-                        "categories": business.get("categories", ""),
-                        "is_claimed": bool(business.get("is_claimed", 0)),
-                        "marker_priority": self._calculate_marker_priority(business),
-                        "cluster_id": self._assign_cluster(lat, lng, geographic_clusters)
-                    }
-                    map_points.append(point)
+                    located.append(business)
+                    lats.append(lat)
+                    lngs.append(lng)
+                    rating_counts.append(business.get("rating_count", 0))
+                    rating_values.append(business.get("rating_value", 0))
+                    photos.append(business.get("total_photos", 0))
+                    claimed.append(bool(business.get("is_claimed", 0)))
+                    contact_points.append(5 * bool(business.get("phone")) + 5 * bool(business.get("address")))
+            
+            # Clustering et priorités des marqueurs en une passe sur les colonnes
+            cluster_labels = _cluster_points(lats, lngs, _CLUSTER_RADIUS)
+            priorities = self._calculate_marker_priorities(claimed, rating_counts, rating_values, photos, contact_points)
+            
+            # Analyse des points sur la carte
+            points = [
+                _MapPoint(
+                    business.get("cid", ""),
+                    business.get("name", ""),
+                    business.get("address", ""),
+                    business["latitude"],
+                    business["longitude"],
+                    rating_count,
+                    rating_value,
+                    business.get("categories", ""),
+                    bool(is_claimed),
+                    priority,
+                    f"cluster_{label + 1}"
+                )
+                for business, rating_count, rating_value, is_claimed, priority, label in zip(
+                    located, rating_counts, rating_values, claimed, priorities, cluster_labels
+                )
+            ]
             
             # Analyse des clusters géographiques
-            cluster_analysis = self._analyze_geographic_clusters(map_points)
+            cluster_analysis = self._analyze_geographic_clusters(points)
             
-            # Calcul du centre de carte optimal
-            optimal_center = self._calculate_optimal_map_center(map_points)
+            # Emprise géographique : une seule série de réductions sur les colonnes
+            point_count = len(lats)
+            if point_count:
+                lat_range = max(lats) - min(lats)
+                lng_range = max(lngs) - min(lngs)
+                lat_sum, lng_sum = sum(lats), sum(lngs)
+            else:
+                lat_range = lng_range = lat_sum = lng_sum = 0.0
+            max_range = max(lat_range, lng_range)
             
-            # Calcul du zoom optimal
-            optimal_zoom = self._calculate_optimal_zoom(map_points)
+            # Calcul du centre de carte optimal
+            optimal_center = self._calculate_optimal_map_center(lat_sum, lng_sum, point_count)
             
-            # Analyse de la densité
-            density_analysis = self._analyze_point_density(map_points)
+            # Zoom, densité et étendue dérivés de l'emprise
+            if point_count > 1:
+                optimal_zoom = self._zoom_from_range(max_range)
+                density_analysis = self._density_from_ranges(point_count, lat_range, lng_range)
+                geographic_spread = self._spread_from_range(max_range)
+            else:
+                optimal_zoom = 15
+                density_analysis = {"density_level": "very_low", "points_per_km2": 0}
+                geographic_spread = "single_point"
             
-            # Points remarquables
-            high_priority_points = [p for p in map_points if p["marker_priority"] >= 80]
-            claimed_businesses = [p for p in map_points if p["is_claimed"]]
-            highly_rated = [p for p in map_points if p["rating"]["value"] >= 4.5 and p["rating"]["count"] >= 10]
+            # Rendu JSON des points, puis points remarquables : les trois sélections en une seule passe
+            map_points = [self._render_map_point(point) for point in points]
+            high_priority_points = []
+            claimed_businesses = []
+            highly_rated = []
+            for point, rendered in zip(points, map_points):
+                if point.priority >= 80:
+                    high_priority_points.append(rendered)
+                if point.is_claimed:
+                    claimed_businesses.append(rendered)
+                if point.rating_value >= 4.5 and point.rating_count >= 10:
+                    highly_rated.append(rendered)
             
             # Configuration de carte recommandée
             map_config = {
@@ -213,7 +441,7 @@ class DomainsGmbBacklinksMapTool(BaseMCPTool):
                 "businesses_with_location": len(map_points),
                 "businesses_without_location": total_count - len(map_points),
                 "location_coverage": round((len(map_points) / total_count * 100), 1) if total_count > 0 else 0,
-                "geographic_spread": self._calculate_geographic_spread(map_points),
+                "geographic_spread": geographic_spread,
                 "density_level": density_analysis["density_level"],
                 "cluster_count": len(cluster_analysis["clusters"])
             }
@@ -230,7 +458,7 @@ class DomainsGmbBacklinksMapTool(BaseMCPTool):
                 "high_priority_businesses": high_priority_points,
                 "claimed_businesses": claimed_businesses,
                 "highly_rated_businesses": highly_rated,
-                "visualization_recommendations": self._generate_map_recommendations(map_points, map_stats),
+                "visualization_recommendations": self._generate_map_recommendations(map_points, map_stats, len(high_priority_points)),
                 "response_metadata": {
                     "response_time": response.get("response_time", ""),
                     "total_businesses": total_count,
@@ -242,95 +470,71 @@ class DomainsGmbBacklinksMapTool(BaseMCPTool):
             logger.error(f"❌ Erreur lors de l'analyse des résultats de carte: {str(e)}")
             return {"error": f"Erreur lors de l'analyse des résultats de carte: {str(e)}"}
     
-    def _calculate_marker_priority(self, business: Dict[str, Any]) -> int:
-        """Calcule la priorité d'affichage d'un marqueur sur la carte"""
-        score = 0
-        
-        # Statut revendiqué
-        if business.get("is_claimed", 0):
-            score += 30
-        
-        # Qualité des avis
-        rating_count = business.get("rating_count", 0)
-        rating_value = business.get("rating_value", 0)
-        
-        if rating_count >= 50:
-            score += 25
-        elif rating_count >= 20:
-            score += 15
-        elif rating_count >= 5:
-            score += 10
-        
-        if rating_value >= 4.5:
-            score += 20
-        elif rating_value >= 4.0:
-            score += 15
-        elif rating_value >= 3.5:
-            score += 10
-        
-        # Photos
-        photos = business.get("total_photos", 0)
-        if photos >= 10:
-            score += 15
-        elif photos >= 5:
-            score += 10
-        
-        # Informations complètes
-        if business.get("phone"):
-            score += 5
-        if business.get("address"):
-            score += 5
-        
-        return min(score, 100)
-    
-    def _assign_cluster(self, lat: float, lng: float, clusters: Dict[str, Any]) -> str:
-        """Assigne un point à un cluster géographique"""
-        cluster_radius = 0.01  # Environ 1km
-        
-        for cluster_id, cluster_data in clusters.items():
-            center_lat = cluster_data["center_lat"]
-            center_lng = cluster_data["center_lng"]
-            
-            distance = ((lat - center_lat) ** 2 + (lng - center_lng) ** 2) ** 0.5
-            if distance <= cluster_radius:
-                # Mettre à jour le centre du cluster
-                cluster_data["points"] += 1
-                cluster_data["center_lat"] = (cluster_data["center_lat"] * (cluster_data["points"] - 1) + lat) / cluster_data["points"]
-                cluster_data["center_lng"] = (cluster_data["center_lng"] * (cluster_data["points"] - 1) + lng) / cluster_data["points"]
-                return cluster_id
-        
-        # Créer un nouveau cluster
-        cluster_id = f"cluster_{len(clusters) + 1}"
-        clusters[cluster_id] = {
-            "center_lat": lat,
-            "center_lng": lng,
-            "points": 1
+    def _render_map_point(self, point: _MapPoint) -> Dict[str, Any]:
+        """Convertit un point de carte en dict au format de la réponse"""
+        return {
+            "cid": point.cid,
+            "name": point.name,
+            "address": point.address,
+            "coordinates": {"lat": point.lat, "lng": point.lng},
+            "rating": {
+                "count": point.rating_count,
+                "value": point.rating_value
+            },
+            "categories": point.categories,
+            "is_claimed": point.is_claimed,
+            "marker_priority": point.priority,
+            "cluster_id": point.cluster_id
         }
-        return cluster_id
     
-    def _analyze_geographic_clusters(self, map_points: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_marker_priorities(self, claimed: bytearray, rating_counts: List[Any], rating_values: List[Any],
+                                     photos: List[Any], contact_points: List[int]) -> List[int]:
+        """Calcule la priorité d'affichage des marqueurs de toutes les entreprises à partir des colonnes"""
+        return [
+            min(
+                # Statut revendiqué
+                30 * is_claimed
+                # Qualité des avis
+                + _RATING_COUNT_SCORES[bisect_right(_RATING_COUNT_THRESHOLDS, rating_count)]
+                + _RATING_VALUE_SCORES[bisect_right(_RATING_VALUE_THRESHOLDS, rating_value)]
+                # Photos
+                + _PHOTOS_SCORES[bisect_right(_PHOTOS_THRESHOLDS, photo_count)]
+                # Informations complètes
+                + contact,
+                100
+            )
+            for is_claimed, rating_count, rating_value, photo_count, contact in zip(
+                claimed, rating_counts, rating_values, photos, contact_points
+            )
+        ]
+    
+    def _analyze_geographic_clusters(self, points: List[_MapPoint]) -> Dict[str, Any]:
         """Analyse les clusters géographiques des points"""
         clusters = {}
         
-        for point in map_points:
-            cluster_id = point.get("cluster_id", "unknown")
+        for point in points:
+            cluster_id = point.cluster_id
             if cluster_id not in clusters:
                 clusters[cluster_id] = {
                     "id": cluster_id,
                     "business_count": 0,
-                    "businesses": [],
+                    "sample_businesses": [],
                     "average_rating": 0,
                     "claimed_count": 0
                 }
             
             cluster = clusters[cluster_id]
-            cluster["business_count"] += 1
-            cluster["businesses"].append(point["name"])
+            business_count = cluster["business_count"] + 1
+            cluster["business_count"] = business_count
+            if business_count <= _CLUSTER_SAMPLE_SIZE:
+                cluster["sample_businesses"].append(point.name)
             
-            if point["rating"]["value"] > 0:
-                cluster["average_rating"] = (cluster["average_rating"] * (cluster["business_count"] - 1) + point["rating"]["value"]) / cluster["business_count"]
+            rating_value = point.rating_value
+            if rating_value > 0:
+                average_rating = cluster["average_rating"]
+                cluster["average_rating"] = average_rating + (rating_value - average_rating) / business_count
             
-            if point["is_claimed"]:
+            if point.is_claimed:
                 cluster["claimed_count"] += 1
         
         # Finaliser les clusters
@@ -344,156 +548,79 @@ class DomainsGmbBacklinksMapTool(BaseMCPTool):
             "largest_cluster": max(clusters.values(), key=lambda x: x["business_count"]) if clusters else None
         }
     
-    def _calculate_optimal_map_center(self, map_points: List[Dict[str, Any]]) -> Dict[str, float]:
-        """Calcule le centre optimal pour la carte"""
-        if not map_points:
+    def _calculate_optimal_map_center(self, lat_sum: float, lng_sum: float, point_count: int) -> Dict[str, float]:
+        """Calcule le centre optimal pour la carte à partir des sommes de coordonnées"""
+        if not point_count:
             return {"lat": 0, "lng": 0}
         
-        total_lat = sum(point["coordinates"]["lat"] for point in map_points)
-        total_lng = sum(point["coordinates"]["lng"] for point in map_points)
-        
         return {
-            "lat": round(total_lat / len(map_points), 6),
-            "lng": round(total_lng / len(map_points), 6)
+            "lat": round(lat_sum / point_count, 6),
+            "lng": round(lng_sum / point_count, 6)
         }
     
-    def _calculate_optimal_zoom(self, map_points: List[Dict[str, Any]]) -> int:
-        """Calcule le niveau de zoom optimal"""
-        if len(map_points) <= 1:
-            return 15
-        
-        # Calcul de la dispersion
-        lats = [point["coordinates"]["lat"] for point in map_points]
-        lngs = [point["coordinates"]["lng"] for point in map_points]
-        
-        lat_range = max(lats) - min(lats)
-        lng_range = max(lngs) - min(lngs)
-        max_range = max(lat_range, lng_range)
-        
+    def _zoom_from_range(self, max_range: float) -> int:
+        """Calcule le niveau de zoom optimal à partir de la plus grande amplitude de coordonnées"""
         # Mapping approximatif range -> zoom
-        if max_range > 10:
-            return 6
-        elif max_range > 5:
-            return 7
-        elif max_range > 2:
-            return 8
-        elif max_range > 1:
-            return 9
-        elif max_range > 0.5:
-            return 10
-        elif max_range > 0.1:
-            return 12
-        elif max_range > 0.05:
-            return 13
-        else:
-            return 14
+        return _ZOOM_VALUES[bisect_left(_ZOOM_THRESHOLDS, max_range)]
     
-    def _analyze_point_density(self, map_points: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyse la densité des points sur la carte"""
-        if len(map_points) <= 1:
-            return {"density_level": "very_low", "points_per_km2": 0}
-        
-        # Calcul de la zone couverte (approximatif)
-        lats = [point["coordinates"]["lat"] for point in map_points]
-        lngs = [point["coordinates"]["lng"] for point in map_points]
-        
-        lat_range = max(lats) - min(lats)
-        lng_range = max(lngs) - min(lngs)
-        
+    def _density_from_ranges(self, point_count: int, lat_range: float, lng_range: float) -> Dict[str, Any]:
+        """Analyse la densité des points sur la carte à partir de l'emprise couverte"""
         # Conversion approximative en km²
         area_km2 = lat_range * lng_range * 111 * 111  # 1 degré ≈ 111 km
         
         if area_km2 == 0:
-            density = len(map_points)
-        else:
-            density = len(map_points) / area_km2
-        
-        # Classification de la densité
-        if density > 100:
-            density_level = "very_high"
-        elif density > 50:
-            density_level = "high"
-        elif density > 10:
-            density_level = "medium"
-        elif density > 1:
-            density_level = "low"
+            density = point_count
         else:
-            density_level = "very_low"
+            density = point_count / area_km2
         
         return {
-            "density_level": density_level,
+            # Classification de la densité
+            "density_level": _DENSITY_LEVELS[bisect_left(_DENSITY_THRESHOLDS, density)],
             "points_per_km2": round(density, 2),
             "coverage_area_km2": round(area_km2, 2)
         }
     
-    def _calculate_geographic_spread(self, map_points: List[Dict[str, Any]]) -> str:
-        """Calcule l'étendue géographique des points"""
-        if len(map_points) <= 1:
-            return "single_point"
-        
-        lats = [point["coordinates"]["lat"] for point in map_points]
-        lngs = [point["coordinates"]["lng"] for point in map_points]
-        
-        lat_range = max(lats) - min(lats)
-        lng_range = max(lngs) - min(lngs)
-        max_range = max(lat_range, lng_range)
-        
-        if max_range > 5:
-            return "very_wide"
-        elif max_range > 1:
-            return "wide"
-        elif max_range > 0.1:
-            return "medium"
-        elif max_range > 0.01:
-            return "narrow"
-        else:
-            return "very_narrow"
+    def _spread_from_range(self, max_range: float) -> str:
+        """Calcule l'étendue géographique des points à partir de la plus grande amplitude de coordonnées"""
+        return _SPREAD_VALUES[bisect_left(_SPREAD_THRESHOLDS, max_range)]
     
-    def _generate_map_recommendations(self, map_points: List[Dict[str, Any]], map_stats: Dict[str, Any]) -> List[str]:
+    def _generate_map_recommendations(self, map_points: List[Dict[str, Any]], map_stats: Dict[str, Any],
+                                      high_priority_count: int) -> List[str]:
         """Génère des recommandations pour la visualisation de carte"""
-        recommendations = []
-        
         if not map_points:
-            return ["Aucune donnée géographique disponible pour la carte"]
+            return [_NO_LOCATION_RECOMMENDATION]
         
-        # Couverture géographique
         location_coverage = map_stats.get("location_coverage", 0)
-        if location_coverage < 70:
-            recommendations.append(f"📍 Seulement {location_coverage}% des entreprises ont des coordonnées, complétez les données")
-        elif location_coverage > 95:
-            recommendations.append("🎯 Excellente couverture géographique des données")
-        
-        # Densité
         density_level = map_stats.get("density_level", "")
-        if density_level == "very_high":
-            recommendations.append("🗺️ Utilisez le clustering de marqueurs pour éviter la surcharge visuelle")
-        elif density_level == "very_low":
-            recommendations.append("📌 Densité faible, zoom plus important recommandé")
-        
-        # Clusters
         cluster_count = map_stats.get("cluster_count", 0)
-        if cluster_count > 5:
-            recommendations.append(f"🎯 {cluster_count} zones géographiques identifiées, analysez chaque cluster")
-        elif cluster_count == 1:
-            recommendations.append("📍 Concentration géographique forte, opportunité de domination locale")
-        
-        # Étendue géographique
         geographic_spread = map_stats.get("geographic_spread", "")
-        if geographic_spread == "very_wide":
-            recommendations.append("🌍 Couverture géographique très large, segmentez par région")
-        elif geographic_spread == "very_narrow":
-            recommendations.append("🎯 Zone géographique concentrée, excellent pour le SEO local")
-        
-        # Qualité des marqueurs
-        high_priority_count = len([p for p in map_points if p["marker_priority"] >= 80])
-        if high_priority_count > 0:
-            recommendations.append(f"⭐ {high_priority_count} entreprise(s) prioritaire(s) à mettre en avant sur la carte")
-        
-        # Recommandations techniques
-        if len(map_points) > 50:
-            recommendations.append("⚡ Activez la carte de chaleur pour une meilleure visualisation")
-        
-        if len(map_points) > 20:
-            recommendations.append("🔧 Implémentez des filtres interactifs (note, statut, catégorie)")
         
-        return recommendations if recommendations else ["🗺️ Carte GMB générée avec succès"]
+        checks = [
+            # Couverture géographique
+            (location_coverage < 70, _LOW_COVERAGE_TEMPLATE),
+            (location_coverage > 95, _HIGH_COVERAGE_MESSAGE),
+            # Densité
+            (density_level == "very_high", _DENSE_MAP_MESSAGE),
+            (density_level == "very_low", _SPARSE_MAP_MESSAGE),
+            # Clusters
+            (cluster_count > 5, _MANY_CLUSTERS_TEMPLATE),
+            (cluster_count == 1, _SINGLE_CLUSTER_MESSAGE),
+            # Étendue géographique
+            (geographic_spread == "very_wide", _VERY_WIDE_MESSAGE),
+            (geographic_spread == "very_narrow", _VERY_NARROW_MESSAGE),
+            # Qualité des marqueurs
+            (high_priority_count > 0, _HIGH_PRIORITY_TEMPLATE),
+            # Recommandations techniques
+            (len(map_points) > 50, _HEAT_MAP_MESSAGE),
+            (len(map_points) > 20, _FILTERS_MESSAGE),
+        ]
+        recommendations = [
+            message.format(
+                location_coverage=location_coverage,
+                cluster_count=cluster_count,
+                high_priority_count=high_priority_count
+            )
+            for condition, message in checks if condition
+        ]
+        
+        return recommendations if recommendations else [_DEFAULT_MAP_RECOMMENDATION]
@@ -3,13 +3,271 @@ MCP Tool pour l'endpoint Haloscan domains/pagesHistory
 Permet d'obtenir l'historique des pages d'un domaine avec leurs performances SEO sur une période donnée
 """
 
-from typing import Dict, Any, List, Optional
-from ...base import BaseMCPTool
+import asyncio
+import heapq
+import math
+from datetime import date, timedelta
+from operator import attrgetter, itemgetter
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from ...base import BaseMCPTool, tool_schema
+from ....cache import SingleFlight, TTLCache, make_cache_key
+from ....config import Config
 from ....dependencies import HaloscanClient
 from ....logging_config import get_logger
 
 logger = get_logger("domains_history_pages_tool")
 
+# Filtres optionnels transmis tels quels à l'API
+_OPTIONAL_FILTERS = frozenset({
+    "total_traffic_min", "total_traffic_max",
+    "unique_keywords_min", "unique_keywords_max",
+    "total_top_3_min", "total_top_3_max",
+    "total_top_10_min", "total_top_10_max",
+    "total_top_50_min", "total_top_50_max",
+    "total_top_100_min", "total_top_100_max",
+    "known_versions_min", "known_versions_max"
+})
+
+# Requêtes pagesHistory en cours, partagées par les appels concurrents identiques
+_INFLIGHT_REQUESTS = SingleFlight()
+
+# Réponses pagesHistory : une période close ne change plus, une période récente peut encore bouger
+_RESPONSE_CACHE = TTLCache(ttl=Config.HALOSCAN_CACHE_TTL, maxsize=2048)
+_CLOSED_PERIOD_TTL = 24 * 3600
+_RECENT_PERIOD_TTL = 5 * 60
+
+# Récupération de toutes les pages de résultats (fetch_all)
+_FETCH_ALL_LINE_COUNT = 100
+_FETCH_ALL_MAX_REQUESTS = 20
+_FETCH_ALL_MAX_CONCURRENCY = 16
+
+# Taille de réponse à partir de laquelle l'analyse est déportée dans un thread
+_THREAD_ANALYSIS_MIN_PAGES = 50
+
+_BY_PERFORMANCE_SCORE = attrgetter("performance_score")
+_BY_TRAFFIC = attrgetter("traffic")
+
+# Champs lus pour chaque page de l'historique, avec leurs valeurs par défaut
+_PAGE_DEFAULTS: Dict[str, Any] = {
+    "url": "",
+    "domain": "",
+    "total_traffic": 0,
+    "unique_keywords": 0,
+    "active_keywords": 0,
+    "lost_keywords": 0,
+    "total_top_3": 0,
+    "total_top_10": 0,
+    "total_top_50": 0,
+    "total_top_100": 0,
+    "first_time_seen": "",
+    "last_time_seen": "",
+    "known_versions": 0
+}
+_PAGE_FIELDS = itemgetter(*_PAGE_DEFAULTS)
+
+# Champs lus dans la réponse de l'API, avec leurs valeurs par défaut
+_RESPONSE_DEFAULTS: Dict[str, Any] = {
+    "results": [],
+    "total_result_count": 0,
+    "filtered_result_count": 0,
+    "returned_result_count": 0,
+    "remaining_result_count": 0,
+    "response_time": ""
+}
+_RESPONSE_FIELDS = itemgetter(*_RESPONSE_DEFAULTS)
+
+# Définition OpenAI de l'outil, construite une seule fois à l'import
+_TOOL_DEFINITION: Dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "domains_history_pages",
+        "description": "Get historical performance data for pages of a domain over a specific time period. Shows how individual pages performed with traffic, keywords, and ranking metrics.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "input": {
+                    "type": "string",
+                    "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
+                },
+                "date_from": {
+                    "type": "string",
+                    "description": "Start date in YYYY-MM-DD format (e.g., '2023-01-01')"
+                },
+                "date_to": {
+                    "type": "string",
+                    "description": "End date in YYYY-MM-DD format (e.g., '2023-12-31')"
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["auto", "root", "domain", "url"],
+                    "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
+                    "default": "auto"
+                },
+                "lineCount": {
+                    "type": "integer",
+                    "description": "Maximum number of pages to return",
+                    "default": 20,
+                    "minimum": 1,
+                    "maximum": 100
+                },
+                "page": {
+                    "type": "integer",
+                    "description": "Page number for pagination",
+                    "default": 1,
+                    "minimum": 1
+                },
+                "order_by": {
+                    "type": "string",
+                    "enum": ["default", "domain", "url", "first_time_seen", "last_time_seen", "known_versions", "total_traffic", "unique_keywords", "total_top_100", "total_top_50", "total_top_10", "total_top_3"],
+                    "description": "Field used for sorting results. Default sorts by descending traffic and then ascending position",
+                    "default": "default"
+                },
+                "order": {
+                    "type": "string",
+                    "enum": ["asc", "desc"],
+                    "description": "Whether the results are sorted in ascending or descending order",
+                    "default": "desc"
+                },
+                "fetch_all": {
+                    "type": "boolean",
+                    "description": "Fetch every result page (100 pages per request, requests sent concurrently, up to 2000 pages) and analyze them together. lineCount and page are ignored",
+                    "default": False
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "Maximum number of concurrent requests when fetch_all is enabled",
+                    "default": 8,
+                    "minimum": 1,
+                    "maximum": 16
+                },
+                "include_all_pages": {
+                    "type": "boolean",
+                    "description": "Whether to return the detailed analysis of every page in addition to the top performers and statistics",
+                    "default": False
+                },
+                "analyze": {
+                    "type": "boolean",
+                    "description": "Whether to compute statistics, top performers and recommendations. Set to false to get the raw API response only",
+                    "default": True
+                },
+                "total_traffic_min": {
+                    "type": "integer",
+                    "description": "Minimum total traffic filter",
+                    "minimum": 0
+                },
+                "total_traffic_max": {
+                    "type": "integer",
+                    "description": "Maximum total traffic filter",
+                    "minimum": 0
+                },
+                "unique_keywords_min": {
+                    "type": "integer",
+                    "description": "Minimum unique keywords filter",
+                    "minimum": 0
+                },
+                "unique_keywords_max": {
+                    "type": "integer",
+                    "description": "Maximum unique keywords filter",
+                    "minimum": 0
+                },
+                "total_top_3_min": {
+                    "type": "integer",
+                    "description": "Minimum top 3 positions filter",
+                    "minimum": 0
+                },
+                "total_top_10_min": {
+                    "type": "integer",
+                    "description": "Minimum top 10 positions filter",
+                    "minimum": 0
+                }
+            },
+            "required": ["input", "date_from", "date_to"]
+        }
+    }
+}
+
+# Règles de recommandation : (section, métrique, seuil haut, message haut, seuil bas, message bas)
+_PERFORMANCE_RULES = (
+    ("keyword_health", "retention_rate_value",
+     80, "🎯 Excellent taux de rétention des mots-clés, vos pages sont stables",
+     60, "⚠️ Taux de rétention faible, analysez les pages qui perdent des positions"),
+    ("averages", "traffic_per_page",
+     1000, "🚀 Excellent trafic moyen par page, optimisez les top performers",
+     100, "📈 Trafic faible par page, concentrez-vous sur l'optimisation SEO"),
+    ("averages", "top_10_per_page",
+     10, "🏆 Bonnes positions en top 10, travaillez vers le top 3",
+     3, "🔧 Peu de positions top 10, renforcez l'autorité de vos pages"),
+)
+_CONTENT_RULES = (
+    ("averages", "keywords_per_page",
+     50, "🎪 Pages riches en mots-clés, bon potentiel de longue traîne",
+     10, "📝 Peu de mots-clés par page, enrichissez votre contenu"),
+)
+# L'URL est tronquée à 50 caractères par le format lui-même, sans découpage préalable
+_STAR_PAGE_TEMPLATE = "🌟 Page star: {url:.50}... avec {traffic:.0f} de trafic"
+_NO_PAGES_RECOMMENDATION = "Aucune page historique trouvée pour cette période"
+_DEFAULT_RECOMMENDATION = "📊 Analyse historique des pages terminée"
+
+
+class _PageAnalysis(NamedTuple):
+    """Analyse compacte d'une page pendant le traitement, convertie en dict JSON à la fin"""
+    url: str
+    domain: str
+    traffic: int
+    unique_keywords: int
+    active_keywords: int
+    lost_keywords: int
+    top_3: int
+    top_10: int
+    top_50: int
+    top_100: int
+    first_seen: str
+    last_seen: str
+    versions: int
+    performance_score: float
+    keyword_retention_rate: str
+
+
+def _threshold_recommendations(rules: Tuple[Tuple[Any, ...], ...], stats: Dict[str, Any]) -> List[str]:
+    """Applique une table de règles à seuils aux statistiques globales (construites par l'analyse)"""
+    recommendations = []
+    for section, metric, high, high_message, low, low_message in rules:
+        value = stats[section][metric]
+        if value > high:
+            recommendations.append(high_message)
+        elif value < low:
+            recommendations.append(low_message)
+    return recommendations
+
+
+def _response_ttl(date_to: str) -> int:
+    """Durée de vie en cache d'une réponse : longue si la période est close (avant hier)"""
+    try:
+        is_closed = date.fromisoformat(date_to) < date.today() - timedelta(days=1)
+    except ValueError:
+        is_closed = False
+    return _CLOSED_PERIOD_TTL if is_closed else _RECENT_PERIOD_TTL
+
+
+def _page_performance_score(traffic: int, active_keywords: int, top_3: int, top_10: int) -> float:
+    """Calcule un score de performance pour une page basé sur ses métriques historiques"""
+    # Score pondéré : trafic (40%), mots-clés actifs (20%), top 3 (25%), top 10 (15%)
+    score = (traffic * 0.4) + (active_keywords * 5 * 0.2) + (top_3 * 100 * 0.25) + (top_10 * 50 * 0.15)
+    return round(score, 2)
+
+
+def _pct(part: int, other: int) -> float:
+    """Part de `part` dans part + other, en pourcentage (0.0 si les deux sont nuls)"""
+    total = part + other
+    return (part / total) * 100 if total else 0.0
+
+
+def _keyword_retention_rate(active: int, lost: int) -> str:
+    """Calcule le taux de rétention des mots-clés pour une page"""
+    return f"{_pct(active, lost):.1f}%" if active or lost else "0%"
+
+
+@tool_schema(_TOOL_DEFINITION)
 class DomainsHistoryPagesTool(BaseMCPTool):
     """Outil MCP pour obtenir l'historique des pages d'un domaine via l'API Haloscan"""
     
@@ -17,95 +275,6 @@ class DomainsHistoryPagesTool(BaseMCPTool):
         self.haloscan_client = haloscan_client
         self.tool_name = "domainshistorypages"
         
-    def get_tool_definition(self) -> Dict[str, Any]:
-        """Définition OpenAI de l'outil pour l'historique des pages d'un domaine"""
-        return {
-            "type": "function",
-            "function": {
-                "name": "domains_history_pages",
-                "description": "Get historical performance data for pages of a domain over a specific time period. Shows how individual pages performed with traffic, keywords, and ranking metrics.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "input": {
-                            "type": "string",
-                            "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
-                        },
-                        "date_from": {
-                            "type": "string",
-                            "description": "Start date in YYYY-MM-DD format (e.g., '2023-01-01')"
-                        },
-                        "date_to": {
-                            "type": "string",
-                            "description": "End date in YYYY-MM-DD format (e.g., '2023-12-31')"
-                        },
-                        "mode": {
-                            "type": "string",
-                            "enum": ["auto", "root", "domain", "url"],
-                            "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
-                            "default": "auto"
-                        },
-                        "lineCount": {
-                            "type": "integer",
-                            "description": "Maximum number of pages to return",
-                            "default": 20,
-                            "minimum": 1,
-                            "maximum": 100
-                        },
-                        "page": {
-                            "type": "integer",
-                            "description": "Page number for pagination",
-                            "default": 1,
-                            "minimum": 1
-                        },
-                        "order_by": {
-                            "type": "string",
-                            "enum": ["default", "domain", "url", "first_time_seen", "last_time_seen", "known_versions", "total_traffic", "unique_keywords", "total_top_100", "total_top_50", "total_top_10", "total_top_3"],
-                            "description": "Field used for sorting results. Default sorts by descending traffic and then ascending position",
-                            "default": "default"
-                        },
-                        "order": {
-                            "type": "string",
-                            "enum": ["asc", "desc"],
-                            "description": "Whether the results are sorted in ascending or descending order",
-                            "default": "desc"
-                        },
-                        "total_traffic_min": {
-                            "type": "integer",
-                            "description": "Minimum total traffic filter",
-                            "minimum": 0
-                        },
-                        "total_traffic_max": {
-                            "type": "integer",
-                            "description": "Maximum total traffic filter",
-                            "minimum": 0
-                        },
-                        "unique_keywords_min": {
-                            "type": "integer",
-                            "description": "Minimum unique keywords filter",
-                            "minimum": 0
-                        },
-                        "unique_keywords_max": {
-                            "type": "integer",
-                            "description": "Maximum unique keywords filter",
-                            "minimum": 0
-                        },
-                        "total_top_3_min": {
-                            "type": "integer",
-                            "description": "Minimum top 3 positions filter",
-                            "minimum": 0
-                        },
-                        "total_top_10_min": {
-                            "type": "integer",
-                            "description": "Minimum top 10 positions filter",
-                            "minimum": 0
-                        }
-                    },
-                    "required": ["input", "date_from", "date_to"]
-                }
-            }
-        }
-    
     async def execute(self, **kwargs) -> Dict[str, Any]:
         """Exécute l'analyse de l'historique des pages d'un domaine"""
         try:
@@ -133,43 +302,118 @@ class DomainsHistoryPagesTool(BaseMCPTool):
                 "order": kwargs.get("order", "desc")
             }
             
-            # Ajout des filtres optionnels
-            optional_filters = [
-                "total_traffic_min", "total_traffic_max",
-                "unique_keywords_min", "unique_keywords_max",
-                "total_top_3_min", "total_top_3_max",
-                "total_top_10_min", "total_top_10_max",
-                "total_top_50_min", "total_top_50_max",
-                "total_top_100_min", "total_top_100_max",
-                "known_versions_min", "known_versions_max"
-            ]
-            
-            for filter_param in optional_filters:
-                if filter_param in kwargs and kwargs[filter_param] is not None:
-                    params[filter_param] = kwargs[filter_param]
+            # Ajout des filtres optionnels renseignés
+            for filter_param in kwargs.keys() & _OPTIONAL_FILTERS:
+                value = kwargs[filter_param]
+                if value is not None:
+                    params[filter_param] = value
             
             logger.info(f"🔍 Analyse historique des pages pour {input_domain} ({date_from} à {date_to})")
             
             # Appel à l'API Haloscan
-            response = await self.haloscan_client.post_async("domains/pagesHistory", params)
+            partial_errors = []
+            if kwargs.get("fetch_all"):
+                response, partial_errors = await self._fetch_all_pages(params, date_to, kwargs.get("concurrency") or 8)
+            else:
+                response = await self._get_pages_history(params, date_to)
             
             if not response:
                 return {"error": "Aucune réponse de l'API Haloscan"}
             
-            # Analyse et synthèse des résultats
-            return self._analyze_history_pages_results(response, input_domain, date_from, date_to)
+            # Réponse brute si l'analyse n'est pas demandée
+            if not kwargs.get("analyze", True):
+                raw_result = {
+                    "domain": input_domain,
+                    "period": {"from": date_from, "to": date_to},
+                    "raw": response
+                }
+                if partial_errors:
+                    raw_result["partial_errors"] = partial_errors
+                return raw_result
+            
+            # Analyse et synthèse des résultats (hors de la boucle asyncio pour les grosses réponses)
+            include_all_pages = bool(kwargs.get("include_all_pages", False))
+            if len(response.get("results") or ()) >= _THREAD_ANALYSIS_MIN_PAGES:
+                analysis = await asyncio.to_thread(
+                    self._analyze_history_pages_results, response, input_domain, date_from, date_to, include_all_pages
+                )
+            else:
+                analysis = self._analyze_history_pages_results(response, input_domain, date_from, date_to, include_all_pages)
+            if partial_errors:
+                analysis["partial_errors"] = partial_errors
+            return analysis
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'analyse historique des pages: {str(e)}")
             return {"error": f"Erreur lors de l'analyse historique des pages: {str(e)}"}
     
-    def _analyze_history_pages_results(self, response: Dict[str, Any], input_domain: str, date_from: str, date_to: str) -> Dict[str, Any]:
+    async def _get_pages_history(self, params: Dict[str, Any], date_to: str) -> Dict[str, Any]:
+        """Retourne la réponse pagesHistory depuis le cache, ou l'appel en cours, ou un nouvel appel"""
+        cache_key = make_cache_key("domains/pagesHistory", params)
+        response = _RESPONSE_CACHE.get(cache_key)
+        if response is None:
+            response = await _INFLIGHT_REQUESTS.run(
+                cache_key, lambda: self._fetch_pages_history(params, cache_key, date_to)
+            )
+        return response
+    
+    async def _fetch_all_pages(self, params: Dict[str, Any], date_to: str,
+                               concurrency: int) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Récupère toutes les pages de résultats : la première, puis les suivantes en parallèle
+        
+        Retourne la réponse fusionnée et les erreurs des pages en échec.
+        """
+        params = {**params, "lineCount": _FETCH_ALL_LINE_COUNT, "page": 1}
+        first_response = await self._get_pages_history(params, date_to)
+        if not first_response:
+            return first_response, []
+        
+        total = first_response.get("filtered_result_count") or first_response.get("total_result_count", 0)
+        request_count = min(math.ceil(total / _FETCH_ALL_LINE_COUNT), _FETCH_ALL_MAX_REQUESTS)
+        pages = range(2, request_count + 1)
+        
+        logger.info(f"📚 Récupération de {request_count} page(s) de résultats")
+        
+        # Chaque page passe par le cache et les appels en cours, avec une concurrence bornée
+        semaphore = asyncio.Semaphore(max(1, min(concurrency, _FETCH_ALL_MAX_CONCURRENCY)))
+        
+        async def get_page(page: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._get_pages_history({**params, "page": page}, date_to)
+        
+        responses = await asyncio.gather(*(get_page(page) for page in pages), return_exceptions=True)
+        
+        # Fusion des résultats dans l'ordre des pages
+        results = list(first_response.get("results") or [])
+        partial_errors = []
+        for page, response in zip(pages, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"⚠️ Page {page} de l'historique en échec: {str(response)}")
+                partial_errors.append({"page": page, "error": str(response)})
+            elif response:
+                results.extend(response.get("results") or [])
+        
+        merged = {
+            **first_response,
+            "results": results,
+            "returned_result_count": len(results),
+            "remaining_result_count": max(total - len(results), 0)
+        }
+        return merged, partial_errors
+    
+    async def _fetch_pages_history(self, params: Dict[str, Any], cache_key: str, date_to: str) -> Dict[str, Any]:
+        """Appelle l'endpoint pagesHistory et met la réponse en cache selon la période demandée"""
+        response = await self.haloscan_client.post_async("domains/pagesHistory", params)
+        if response:
+            _RESPONSE_CACHE.set(cache_key, response, ttl=_response_ttl(date_to))
+        return response
+    
+    def _analyze_history_pages_results(self, response: Dict[str, Any], input_domain: str, date_from: str, date_to: str,
+                                       include_all_pages: bool = False) -> Dict[str, Any]:
         """Analyse et synthèse des résultats de l'historique des pages"""
         try:
-            results = response.get("results", [])
-            total_count = response.get("total_result_count", 0)
-            filtered_count = response.get("filtered_result_count", 0)
-            returned_count = response.get("returned_result_count", 0)
+            (results, total_count, filtered_count, returned_count,
+             remaining_count, response_time) = _RESPONSE_FIELDS({**_RESPONSE_DEFAULTS, **response})
             
             if not results:
                 return {
@@ -180,47 +424,40 @@ class DomainsHistoryPagesTool(BaseMCPTool):
                     "pages": []
                 }
             
-            # Analyse des métriques globales
-            total_traffic = sum(page.get("total_traffic", 0) for page in results)
-            total_keywords = sum(page.get("unique_keywords", 0) for page in results)
-            total_active_keywords = sum(page.get("active_keywords", 0) for page in results)
-            total_lost_keywords = sum(page.get("lost_keywords", 0) for page in results)
+            # Extraction des champs de chaque page, puis totaux calculés colonne par colonne
+            rows = [_PAGE_FIELDS({**_PAGE_DEFAULTS, **page}) for page in results]
+            (_, _, traffic_column, keywords_column, active_column, lost_column,
+             top_3_column, top_10_column, top_50_column, *_) = zip(*rows)
             
-            # Analyse des positions top
-            total_top_3 = sum(page.get("total_top_3", 0) for page in results)
-            total_top_10 = sum(page.get("total_top_10", 0) for page in results)
-            total_top_50 = sum(page.get("total_top_50", 0) for page in results)
+            total_traffic = sum(traffic_column)
+            total_keywords = sum(keywords_column)
+            total_active_keywords = sum(active_column)
+            total_lost_keywords = sum(lost_column)
+            total_top_3 = sum(top_3_column)
+            total_top_10 = sum(top_10_column)
+            total_top_50 = sum(top_50_column)
             
             # Analyse des pages individuelles
-            analyzed_pages = []
-            for page in results:
-                page_analysis = {
-                    "url": page.get("url", ""),
-                    "domain": page.get("domain", ""),
-                    "traffic": page.get("total_traffic", 0),
-                    "keywords": {
-                        "unique": page.get("unique_keywords", 0),
-                        "active": page.get("active_keywords", 0),
-                        "lost": page.get("lost_keywords", 0)
-                    },
-                    "positions": {
-                        "top_3": page.get("total_top_3", 0),
-                        "top_10": page.get("total_top_10", 0),
-                        "top_50": page.get("total_top_50", 0),
-                        "top_100": page.get("total_top_100", 0)
-                    },
-                    "timeline": {
-                        "first_seen": page.get("first_time_seen", ""),
-                        "last_seen": page.get("last_time_seen", ""),
-                        "versions": page.get("known_versions", 0)
-                    },
-                    "performance_score": self._calculate_page_performance_score(page),
-                    "keyword_retention_rate": self._calculate_keyword_retention_rate(page)
-                }
-                analyzed_pages.append(page_analysis)
+            analyzed_pages = [
+                _PageAnalysis(
+                    *row,
+                    _page_performance_score(traffic, active_keywords, top_3, top_10),
+                    _keyword_retention_rate(active_keywords, lost_keywords)
+                )
+                for row, traffic, active_keywords, lost_keywords, top_3, top_10 in zip(
+                    rows, traffic_column, active_column, lost_column, top_3_column, top_10_column
+                )
+            ]
             
             # Identification des pages les plus performantes
-            top_performers = sorted(analyzed_pages, key=lambda x: x["performance_score"], reverse=True)[:5]
+            if len(analyzed_pages) == 1:
+                top_performers = analyzed_pages[:]
+            else:
+                top_performers = heapq.nlargest(5, analyzed_pages, key=_BY_PERFORMANCE_SCORE)
+            
+            # Taux de rétention global, conservé en valeur numérique pour les recommandations
+            has_tracked_keywords = bool(total_active_keywords or total_lost_keywords)
+            retention_value = round(_pct(total_active_keywords, total_lost_keywords), 1)
             
             # Statistiques globales
             stats = {
@@ -231,7 +468,8 @@ class DomainsHistoryPagesTool(BaseMCPTool):
                 "keyword_health": {
                     "active_keywords": total_active_keywords,
                     "lost_keywords": total_lost_keywords,
-                    "retention_rate": f"{(total_active_keywords/(total_active_keywords + total_lost_keywords))*100:.1f}%" if (total_active_keywords + total_lost_keywords) > 0 else "0%"
+                    "retention_rate": f"{retention_value:.1f}%" if has_tracked_keywords else "0%",
+                    "retention_rate_value": retention_value
                 },
                 "position_distribution": {
                     "top_3": total_top_3,
@@ -245,90 +483,71 @@ class DomainsHistoryPagesTool(BaseMCPTool):
                 }
             }
             
-            return {
+            analysis = {
                 "summary": f"Analyse historique de {returned_count} pages pour {input_domain}",
                 "domain": input_domain,
                 "period": {"from": date_from, "to": date_to},
                 "statistics": stats,
-                "top_performers": top_performers,
-                "all_pages": analyzed_pages,
+                "top_performers": [self._render_page_analysis(page) for page in top_performers],
                 "recommendations": self._generate_history_pages_recommendations(analyzed_pages, stats),
                 "response_metadata": {
-                    "response_time": response.get("response_time", ""),
+                    "response_time": response_time,
                     "total_results": total_count,
                     "filtered_results": filtered_count,
-                    "remaining_results": response.get("remaining_result_count", 0)
+                    "remaining_results": remaining_count
                 }
             }
             
+            # Détail de toutes les pages uniquement sur demande (le plus gros bloc de la réponse)
+            if include_all_pages:
+                analysis["all_pages"] = [self._render_page_analysis(page) for page in analyzed_pages]
+            
+            return analysis
+            
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'analyse des résultats: {str(e)}")
             return {"error": f"Erreur lors de l'analyse des résultats: {str(e)}"}
     
-    def _calculate_page_performance_score(self, page: Dict[str, Any]) -> float:
-        """Calcule un score de performance pour une page basé sur ses métriques historiques"""
-        traffic = page.get("total_traffic", 0)
-        active_keywords = page.get("active_keywords", 0)
-        top_3 = page.get("total_top_3", 0)
-        top_10 = page.get("total_top_10", 0)
-        
-        # Score pondéré : trafic (40%), mots-clés actifs (20%), top 3 (25%), top 10 (15%)
-        score = (traffic * 0.4) + (active_keywords * 5 * 0.2) + (top_3 * 100 * 0.25) + (top_10 * 50 * 0.15)
-        return round(score, 2)
-    
-    def _calculate_keyword_retention_rate(self, page: Dict[str, Any]) -> str:
-        """Calcule le taux de rétention des mots-clés pour une page"""
-        active = page.get("active_keywords", 0)
-        lost = page.get("lost_keywords", 0)
-        total = active + lost
-        
-        if total == 0:
-            return "0%"
-        
-        retention_rate = (active / total) * 100
-        return f"{retention_rate:.1f}%"
+    def _render_page_analysis(self, page: _PageAnalysis) -> Dict[str, Any]:
+        """Convertit l'analyse d'une page en dict au format de la réponse"""
+        return {
+            "url": page.url,
+            "domain": page.domain,
+            "traffic": page.traffic,
+            "keywords": {
+                "unique": page.unique_keywords,
+                "active": page.active_keywords,
+                "lost": page.lost_keywords
+            },
+            "positions": {
+                "top_3": page.top_3,
+                "top_10": page.top_10,
+                "top_50": page.top_50,
+                "top_100": page.top_100
+            },
+            "timeline": {
+                "first_seen": page.first_seen,
+                "last_seen": page.last_seen,
+                "versions": page.versions
+            },
+            "performance_score": page.performance_score,
+            "keyword_retention_rate": page.keyword_retention_rate
+        }
     
-    def _generate_history_pages_recommendations(self, pages: List[Dict[str, Any]], stats: Dict[str, Any]) -> List[str]:
+    def _generate_history_pages_recommendations(self, pages: List[_PageAnalysis], stats: Dict[str, Any]) -> List[str]:
         """Génère des recommandations basées sur l'analyse historique des pages"""
-        recommendations = []
-        
         if not pages:
-            return ["Aucune page historique trouvée pour cette période"]
-        
-        # Analyse du taux de rétention global
-        retention_rate = stats.get("keyword_health", {}).get("retention_rate", "0%")
-        retention_value = float(retention_rate.replace("%", ""))
-        
-        if retention_value > 80:
-            recommendations.append("🎯 Excellent taux de rétention des mots-clés, vos pages sont stables")
-        elif retention_value < 60:
-            recommendations.append("⚠️ Taux de rétention faible, analysez les pages qui perdent des positions")
-        
-        # Analyse du trafic moyen
-        avg_traffic = stats.get("averages", {}).get("traffic_per_page", 0)
-        if avg_traffic > 1000:
-            recommendations.append("🚀 Excellent trafic moyen par page, optimisez les top performers")
-        elif avg_traffic < 100:
-            recommendations.append("📈 Trafic faible par page, concentrez-vous sur l'optimisation SEO")
+            return [_NO_PAGES_RECOMMENDATION]
         
-        # Analyse des positions top
-        avg_top_10 = stats.get("averages", {}).get("top_10_per_page", 0)
-        if avg_top_10 > 10:
-            recommendations.append("🏆 Bonnes positions en top 10, travaillez vers le top 3")
-        elif avg_top_10 < 3:
-            recommendations.append("🔧 Peu de positions top 10, renforcez l'autorité de vos pages")
+        # Rétention, trafic moyen et positions top
+        recommendations = _threshold_recommendations(_PERFORMANCE_RULES, stats)
         
         # Analyse des pages performantes
-        if pages:
-            best_page = max(pages, key=lambda x: x["traffic"])
-            if best_page["traffic"] > 0:
-                recommendations.append(f"🌟 Page star: {best_page['url'][:50]}... avec {best_page['traffic']:.0f} de trafic")
+        best_page = max(pages, key=_BY_TRAFFIC)
+        if best_page.traffic > 0:
+            recommendations.append(_STAR_PAGE_TEMPLATE.format(url=best_page.url, traffic=best_page.traffic))
         
         # Recommandations sur la diversité des mots-clés
-        avg_keywords = stats.get("averages", {}).get("keywords_per_page", 0)
-        if avg_keywords > 50:
-            recommendations.append("🎪 Pages riches en mots-clés, bon potentiel de longue traîne")
-        elif avg_keywords < 10:
-            recommendations.append("📝 Peu de mots-clés par page, enrichissez votre contenu")
+        recommendations.extend(_threshold_recommendations(_CONTENT_RULES, stats))
         
-        return recommendations if recommendations else ["📊 Analyse historique des pages terminée"]
+        return recommendations if recommendations else [_DEFAULT_RECOMMENDATION]
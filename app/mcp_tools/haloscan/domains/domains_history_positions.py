@@ -3,13 +3,255 @@ MCP Tool pour l'endpoint Haloscan domains/history
 Permet d'obtenir l'historique des positions d'un domaine sur une période donnée
 """
 
-from typing import Dict, Any, List, Optional
-from ...base import BaseMCPTool
+import asyncio
+import math
+from bisect import bisect_right
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Any, List, NamedTuple, Optional, Set, Tuple
+from ...base import BaseMCPTool, tool_schema
+from ....cache import SingleFlight, TTLCache, make_cache_key
+from ....config import Config
 from ....dependencies import HaloscanClient
 from ....logging_config import get_logger
 
 logger = get_logger("domains_history_positions_tool")
 
+# Réponses domains/history récentes et requêtes en cours, partagées entre les appels identiques
+_RESPONSE_CACHE = TTLCache(ttl=Config.HALOSCAN_CACHE_TTL, maxsize=1024)
+_RESPONSE_TTL = 5 * 60
+_INFLIGHT_REQUESTS = SingleFlight()
+
+# Analyses complètes (récupération + synthèse) en cours, partagées entre les appels identiques
+_INFLIGHT_ANALYSES = SingleFlight()
+
+# Paramètres requis (dans l'ordre de validation) et message d'erreur associé
+_REQUIRED_PARAMS = (
+    ("input", "Le paramètre 'input' (domaine) est requis"),
+    ("date_from", "Le paramètre 'date_from' est requis (format YYYY-MM-DD)"),
+    ("date_to", "Le paramètre 'date_to' est requis (format YYYY-MM-DD)")
+)
+
+# Filtres optionnels transmis tels quels à l'API
+_OPTIONAL_FILTERS = frozenset({
+    "still_there", "volume_min", "volume_max", "cpc_min", "cpc_max",
+    "competition_min", "competition_max", "kgr_min", "kgr_max",
+    "best_position_min", "best_position_max", "worst_position_min", "worst_position_max",
+    "most_recent_position_min", "most_recent_position_max",
+    "word_count_min", "word_count_max", "keyword_include", "keyword_exclude"
+})
+
+# Champs lus pour chaque mot-clé de l'historique, avec leurs valeurs par défaut
+_KEYWORD_DEFAULTS: Dict[str, Any] = {
+    "keyword": "",
+    "url": "",
+    "most_recent_position": None,
+    "best_position": None,
+    "worst_position": None,
+    "most_recent_traffic": 0,
+    "volume": 0,
+    "cpc": 0,
+    "competition": None,
+    "still_there": False,
+    "first_time_seen": "",
+    "last_time_seen": "",
+    "times_seen": 0
+}
+_KEYWORD_FIELDS = itemgetter(*_KEYWORD_DEFAULTS)
+
+# Métadonnées lues dans la réponse de l'API, avec leurs valeurs par défaut
+_RESPONSE_DEFAULTS: Dict[str, Any] = {
+    "total_result_count": 0,
+    "filtered_result_count": 0,
+    "returned_result_count": 0,
+    "remaining_result_count": 0,
+    "response_time": ""
+}
+_RESPONSE_FIELDS = itemgetter(*_RESPONSE_DEFAULTS)
+
+# Récupération de plusieurs pages en parallèle (max_rows)
+_API_MAX_LINE_COUNT = 100
+_MAX_ROWS_LIMIT = 1000
+
+# Nombre maximal d'analyses de domaines menées en parallèle (inputs)
+_MULTI_DOMAIN_CONCURRENCY = 8
+
+# Préchargements de la page suivante en cours (références conservées jusqu'à leur fin)
+_PREFETCH_TASKS: Set["asyncio.Task[None]"] = set()
+
+
+class _PositionTotals(NamedTuple):
+    """Agrégats cumulés sur les mots-clés analysés"""
+    keywords: int
+    improving: int
+    declining: int
+    traffic: int
+    active: int
+    best_n: int
+    best_sum: int
+    best_min: Optional[int]
+    current_n: int
+    current_sum: int
+    volume_n: int
+    volume_sum: int
+    volume_max: int
+
+
+# Seuils de classement des indicateurs pour bisect_right : niveau 0 sous le seuil bas,
+# 2 strictement au-dessus du seuil haut, 1 entre les deux (bornes comprises)
+_RETENTION_THRESHOLDS = (50, math.nextafter(80, math.inf))
+_TRAFFIC_THRESHOLDS = (10, math.nextafter(100, math.inf))
+_POSITION_THRESHOLDS = (10, math.nextafter(20, math.inf))
+
+# Recommandation associée à chaque niveau d'indicateur (None : aucune)
+_RETENTION_MESSAGES = (
+    "⚠️ Taux de rétention faible, analysez les causes de perte de positions",
+    None,
+    "🎯 Excellent taux de rétention des positions, votre SEO est stable"
+)
+_TREND_MESSAGES = (
+    "📉 Attention: plus de mots-clés en déclin, révision SEO nécessaire",
+    None,
+    "📈 Plus de mots-clés en progression qu'en déclin, tendance positive"
+)
+_TRAFFIC_MESSAGES = (
+    "🔧 Trafic faible, concentrez-vous sur les mots-clés à fort volume",
+    None,
+    "🚀 Bon trafic moyen par mot-clé, optimisez les top performers"
+)
+_POSITION_MESSAGES = (
+    "🏆 Bonnes positions moyennes, maintenez vos efforts SEO",
+    None,
+    "📊 Positions moyennes élevées, travaillez l'optimisation on-page"
+)
+_DEFAULT_RECOMMENDATION = "📊 Analyse historique terminée, consultez les données détaillées"
+
+
+@lru_cache(maxsize=512)
+def _history_recommendations(retention_level: int, trend_level: int, traffic_level: int,
+                             position_level: Optional[int]) -> Tuple[str, ...]:
+    """Recommandations pour des niveaux d'indicateurs 0, 1 ou 2 (mémoïsé : l'espace des clés est réduit)
+
+    position_level est None sans statistiques de position.
+    """
+    messages = (
+        _RETENTION_MESSAGES[retention_level],
+        _TREND_MESSAGES[trend_level],
+        _TRAFFIC_MESSAGES[traffic_level],
+        _POSITION_MESSAGES[position_level] if position_level is not None else None
+    )
+    return tuple(filter(None, messages)) or (_DEFAULT_RECOMMENDATION,)
+
+
+# Définition OpenAI de l'outil, construite une seule fois à l'import
+_TOOL_DEFINITION: Dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "domains_history_positions",
+        "description": "Get historical keyword positions for a domain over a specific time period. Shows how keywords performed over time with detailed metrics.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "input": {
+                    "type": "string",
+                    "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
+                },
+                "inputs": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Additional domains or URLs to analyze together with 'input' over the same period. Requests are sent concurrently and analyses are returned per domain",
+                    "maxItems": 10
+                },
+                "date_from": {
+                    "type": "string",
+                    "description": "Start date in YYYY-MM-DD format (e.g., '2023-01-01')"
+                },
+                "date_to": {
+                    "type": "string",
+                    "description": "End date in YYYY-MM-DD format (e.g., '2023-12-31')"
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["auto", "root", "domain", "url"],
+                    "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
+                    "default": "auto"
+                },
+                "lineCount": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return",
+                    "default": 20,
+                    "minimum": 1,
+                    "maximum": 100
+                },
+                "page": {
+                    "type": "integer",
+                    "description": "Page number for pagination",
+                    "default": 1,
+                    "minimum": 1
+                },
+                "order_by": {
+                    "type": "string",
+                    "enum": ["default", "volume", "traffic", "position", "keyword", "url", "cpc", "competition", "kgr", "allintitle", "last_scrap", "word_count", "result_count"],
+                    "description": "Field used for sorting results. Default sorts by descending traffic and then ascending position",
+                    "default": "default"
+                },
+                "order": {
+                    "type": "string",
+                    "enum": ["asc", "desc"],
+                    "description": "Whether the results are sorted in ascending or descending order",
+                    "default": "desc"
+                },
+                "max_rows": {
+                    "type": "integer",
+                    "description": "Total number of keywords to analyze when more than lineCount are needed. Pages of 100 keywords are requested concurrently and analyzed together",
+                    "minimum": 1,
+                    "maximum": 1000
+                },
+                "prefetch_next_page": {
+                    "type": "boolean",
+                    "description": "When TRUE, the next page is loaded into the cache in the background while this one is analyzed. Costs one extra API request; only useful when you will ask for page+1. Ignored with max_rows",
+                    "default": False
+                },
+                "still_there": {
+                    "type": "boolean",
+                    "description": "When TRUE, only keep positions that are still held. When FALSE, only keep positions that were lost. Leave empty if you don't want to filter."
+                },
+                "volume_min": {
+                    "type": "integer",
+                    "description": "Minimum search volume filter",
+                    "minimum": 0
+                },
+                "volume_max": {
+                    "type": "integer",
+                    "description": "Maximum search volume filter",
+                    "minimum": 0
+                },
+                "best_position_min": {
+                    "type": "integer",
+                    "description": "Minimum best position filter",
+                    "minimum": 1
+                },
+                "best_position_max": {
+                    "type": "integer",
+                    "description": "Maximum best position filter",
+                    "minimum": 1
+                },
+                "keyword_include": {
+                    "type": "string",
+                    "description": "Regular expression for keywords to be included"
+                },
+                "keyword_exclude": {
+                    "type": "string",
+                    "description": "Regular expression for keywords to be excluded"
+                }
+            },
+            "required": ["input", "date_from", "date_to"]
+        }
+    }
+}
+
+
+@tool_schema(_TOOL_DEFINITION)
 class DomainsHistoryPositionsTool(BaseMCPTool):
     """Outil MCP pour obtenir l'historique des positions d'un domaine via l'API Haloscan"""
     
@@ -17,160 +259,208 @@ class DomainsHistoryPositionsTool(BaseMCPTool):
         self.haloscan_client = haloscan_client
         self.tool_name = "domainshistorypositions"
         
-    def get_tool_definition(self) -> Dict[str, Any]:
-        """Définition OpenAI de l'outil pour l'historique des positions d'un domaine"""
-        return {
-            "type": "function",
-            "function": {
-                "name": "domains_history_positions",
-                "description": "Get historical keyword positions for a domain over a specific time period. Shows how keywords performed over time with detailed metrics.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "input": {
-                            "type": "string",
-                            "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
-                        },
-                        "date_from": {
-                            "type": "string",
-                            "description": "Start date in YYYY-MM-DD format (e.g., '2023-01-01')"
-                        },
-                        "date_to": {
-                            "type": "string",
-                            "description": "End date in YYYY-MM-DD format (e.g., '2023-12-31')"
-                        },
-                        "mode": {
-                            "type": "string",
-                            "enum": ["auto", "root", "domain", "url"],
-                            "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
-                            "default": "auto"
-                        },
-                        "lineCount": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return",
-                            "default": 20,
-                            "minimum": 1,
-                            "maximum": 100
-                        },
-                        "page": {
-                            "type": "integer",
-                            "description": "Page number for pagination",
-                            "default": 1,
-                            "minimum": 1
-                        },
-                        "order_by": {
-                            "type": "string",
-                            "enum": ["default", "volume", "traffic", "position", "keyword", "url", "cpc", "competition", "kgr", "allintitle", "last_scrap", "word_count", "result_count"],
-                            "description": "Field used for sorting results. Default sorts by descending traffic and then ascending position",
-                            "default": "default"
-                        },
-                        "order": {
-                            "type": "string",
-                            "enum": ["asc", "desc"],
-                            "description": "Whether the results are sorted in ascending or descending order",
-                            "default": "desc"
-                        },
-                        "still_there": {
-                            "type": "boolean",
-                            "description": "When TRUE, only keep positions that are still held. When FALSE, only keep positions that were lost. Leave empty if you don't want to filter."
-                        },
-                        "volume_min": {
-                            "type": "integer",
-                            "description": "Minimum search volume filter",
-                            "minimum": 0
-                        },
-                        "volume_max": {
-                            "type": "integer",
-                            "description": "Maximum search volume filter",
-                            "minimum": 0
-                        },
-                        "best_position_min": {
-                            "type": "integer",
-                            "description": "Minimum best position filter",
-                            "minimum": 1
-                        },
-                        "best_position_max": {
-                            "type": "integer",
-                            "description": "Maximum best position filter",
-                            "minimum": 1
-                        },
-                        "keyword_include": {
-                            "type": "string",
-                            "description": "Regular expression for keywords to be included"
-                        },
-                        "keyword_exclude": {
-                            "type": "string",
-                            "description": "Regular expression for keywords to be excluded"
-                        }
-                    },
-                    "required": ["input", "date_from", "date_to"]
-                }
-            }
-        }
-    
     async def execute(self, **kwargs) -> Dict[str, Any]:
         """Exécute l'analyse de l'historique des positions d'un domaine"""
         try:
             # Validation des paramètres requis
-            input_domain = kwargs.get("input", "").strip()
-            date_from = kwargs.get("date_from", "").strip()
-            date_to = kwargs.get("date_to", "").strip()
-            
-            if not input_domain:
-                return {"error": "Le paramètre 'input' (domaine) est requis"}
-            if not date_from:
-                return {"error": "Le paramètre 'date_from' est requis (format YYYY-MM-DD)"}
-            if not date_to:
-                return {"error": "Le paramètre 'date_to' est requis (format YYYY-MM-DD)"}
-            
-            # Préparation des paramètres
-            params = {
-                "input": input_domain,
-                "date_from": date_from,
-                "date_to": date_to,
-                "mode": kwargs.get("mode", "auto"),
-                "lineCount": kwargs.get("lineCount", 20),
-                "page": kwargs.get("page", 1),
-                "order_by": kwargs.get("order_by", "default"),
-                "order": kwargs.get("order", "desc")
-            }
-            
-            # Ajout des filtres optionnels
-            optional_filters = [
-                "still_there", "volume_min", "volume_max", "cpc_min", "cpc_max",
-                "competition_min", "competition_max", "kgr_min", "kgr_max",
-                "best_position_min", "best_position_max", "worst_position_min", "worst_position_max",
-                "most_recent_position_min", "most_recent_position_max",
-                "word_count_min", "word_count_max", "keyword_include", "keyword_exclude"
-            ]
-            
-            for filter_param in optional_filters:
-                if filter_param in kwargs and kwargs[filter_param] is not None:
-                    params[filter_param] = kwargs[filter_param]
+            required, error = self._validate(kwargs)
+            if error:
+                return {"error": error}
+            input_domain, date_from, date_to = required
             
-            logger.info(f"🔍 Analyse historique des positions pour {input_domain} ({date_from} à {date_to})")
+            # Plusieurs domaines : analyses lancées ensemble
+            extra_domains = [domain.strip() for domain in kwargs.get("inputs") or [] if domain and domain.strip()]
+            if extra_domains:
+                return await self._execute_many([input_domain, *extra_domains], date_from, date_to, kwargs)
             
-            # Appel à l'API Haloscan
-            response = await self.haloscan_client.post_async("domains/history", params)
-            
-            if not response:
-                return {"error": "Aucune réponse de l'API Haloscan"}
-            
-            # Analyse et synthèse des résultats
-            return self._analyze_history_positions_results(response, input_domain, date_from, date_to)
+            return await self._execute_one(input_domain, date_from, date_to, kwargs)
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'analyse historique: {str(e)}")
             return {"error": f"Erreur lors de l'analyse historique: {str(e)}"}
     
+    async def _execute_one(self, input_domain: str, date_from: str, date_to: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Récupère et analyse l'historique des positions d'un domaine"""
+        params = self._build_params(input_domain, date_from, date_to, kwargs)
+        max_rows = kwargs.get("max_rows")
+        prefetch_next_page = bool(kwargs.get("prefetch_next_page")) and not max_rows
+        
+        # Un appel identique déjà en cours est attendu plutôt que récupéré et analysé à nouveau
+        analysis_key = make_cache_key("domains/history:analysis", params, max_rows, prefetch_next_page)
+        return await _INFLIGHT_ANALYSES.run(
+            analysis_key,
+            lambda: self._fetch_and_analyze(params, max_rows, input_domain, date_from, date_to, prefetch_next_page)
+        )
+    
+    async def _fetch_and_analyze(self, params: Dict[str, Any], max_rows: Optional[int], input_domain: str,
+                                 date_from: str, date_to: str, prefetch_next_page: bool = False) -> Dict[str, Any]:
+        """Récupère la ou les pages demandées puis en produit l'analyse"""
+        logger.info(f"🔍 Analyse historique des positions pour {input_domain} ({date_from} à {date_to})")
+        
+        # Appel à l'API Haloscan : plusieurs pages en parallèle si max_rows dépasse lineCount
+        partial_errors = []
+        if max_rows and max_rows > params["lineCount"]:
+            response, partial_errors = await self._fetch_rows(params, max_rows)
+        else:
+            response = await self._get_positions_history(params)
+        
+        if not response:
+            error = {"error": "Aucune réponse de l'API Haloscan"}
+            if partial_errors:
+                error["partial_errors"] = partial_errors
+            return error
+        
+        # Page suivante chargée en cache pendant l'analyse de la page courante (sur demande : coûte une requête)
+        if prefetch_next_page:
+            self._schedule_next_page_prefetch(params, response)
+        
+        # Analyse et synthèse des résultats
+        analysis = self._analyze_history_positions_results(response, input_domain, date_from, date_to)
+        if partial_errors:
+            analysis["partial_errors"] = partial_errors
+        return analysis
+    
+    async def _execute_many(self, domains: List[str], date_from: str, date_to: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyse l'historique de plusieurs domaines en parallèle (concurrence bornée)"""
+        domains = list(dict.fromkeys(domains))
+        logger.info(f"🔍 Analyse historique des positions pour {len(domains)} domaine(s) ({date_from} à {date_to})")
+        
+        results_by_domain = await self._execute_per_domain(
+            domains,
+            lambda domain: self._execute_one(domain, date_from, date_to, kwargs),
+            "Erreur lors de l'analyse historique",
+            concurrency=_MULTI_DOMAIN_CONCURRENCY
+        )
+        
+        return {
+            "summary": f"Analyse historique des positions de {len(domains)} domaine(s)",
+            "domains": domains,
+            "period": {"from": date_from, "to": date_to},
+            "results_by_domain": results_by_domain
+        }
+    
+    def _build_params(self, input_domain: str, date_from: str, date_to: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Prépare les paramètres de la requête API pour un domaine"""
+        params = {
+            "input": input_domain,
+            "date_from": date_from,
+            "date_to": date_to,
+            "mode": kwargs.get("mode", "auto"),
+            "lineCount": kwargs.get("lineCount", 20),
+            "page": kwargs.get("page", 1),
+            "order_by": kwargs.get("order_by", "default"),
+            "order": kwargs.get("order", "desc")
+        }
+        
+        # Ajout des filtres optionnels renseignés
+        params.update(
+            (filter_param, kwargs[filter_param])
+            for filter_param in kwargs.keys() & _OPTIONAL_FILTERS
+            if kwargs[filter_param] is not None
+        )
+        
+        return params
+    
+    @staticmethod
+    def _validate(kwargs: Dict[str, Any]) -> Tuple[Tuple[str, ...], Optional[str]]:
+        """Valide les paramètres requis et retourne leurs valeurs nettoyées, ou le message d'erreur"""
+        values = []
+        for name, error in _REQUIRED_PARAMS:
+            value = kwargs.get(name, "").strip()
+            if not value:
+                return (), error
+            values.append(value)
+        return tuple(values), None
+    
+    async def _get_positions_history(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Retourne la réponse domains/history depuis le cache, ou l'appel en cours, ou un nouvel appel"""
+        cache_key = make_cache_key("domains/history", params)
+        response = _RESPONSE_CACHE.get(cache_key)
+        if response is None:
+            response = await _INFLIGHT_REQUESTS.run(
+                cache_key, lambda: self._fetch_positions_history(params, cache_key)
+            )
+        return response
+    
+    async def _fetch_positions_history(self, params: Dict[str, Any], cache_key: str) -> Dict[str, Any]:
+        """Appelle l'endpoint domains/history et met la réponse en cache"""
+        response = await self.haloscan_client.post_async("domains/history", params)
+        if response:
+            _RESPONSE_CACHE.set(cache_key, response, ttl=_RESPONSE_TTL)
+        return response
+    
+    async def _fetch_rows(self, params: Dict[str, Any], max_rows: int) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Récupère en parallèle les pages nécessaires pour max_rows mots-clés et fusionne leurs résultats
+        
+        Retourne la réponse fusionnée (None si aucune page n'a répondu) et les erreurs des pages en échec.
+        """
+        max_rows = min(max_rows, _MAX_ROWS_LIMIT)
+        pages = self._row_pages(params, max_rows)
+        
+        logger.info(f"📚 Récupération de {len(pages)} page(s) de positions en parallèle")
+        
+        responses = await asyncio.gather(
+            *(self._get_positions_history(page_params) for page_params in pages), return_exceptions=True
+        )
+        
+        first_response = None
+        results = []
+        partial_errors = []
+        for page_params, response in zip(pages, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"⚠️ Page {page_params['page']} de l'historique en échec: {str(response)}")
+                partial_errors.append({"page": page_params["page"], "error": str(response)})
+            elif response:
+                if first_response is None:
+                    first_response = response
+                results.extend(response.get("results") or [])
+        
+        if first_response is None:
+            return None, partial_errors
+        
+        del results[max_rows:]
+        total = first_response.get("filtered_result_count") or first_response.get("total_result_count") or 0
+        merged = {
+            **first_response,
+            "results": results,
+            "returned_result_count": len(results),
+            "remaining_result_count": max(total - len(results), 0)
+        }
+        return merged, partial_errors
+    
+    @staticmethod
+    def _row_pages(params: Dict[str, Any], max_rows: int) -> List[Dict[str, Any]]:
+        """Paramètres des pages de lineCount maximal couvrant max_rows mots-clés"""
+        return [
+            {**params, "page": page, "lineCount": _API_MAX_LINE_COUNT}
+            for page in range(1, math.ceil(max_rows / _API_MAX_LINE_COUNT) + 1)
+        ]
+    
+    def _schedule_next_page_prefetch(self, params: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Lance en tâche de fond le chargement de la page suivante s'il en reste une"""
+        if Config.HALOSCAN_CACHE_TTL <= 0:
+            return
+        
+        total = response.get("filtered_result_count") or response.get("total_result_count") or 0
+        if params["page"] * params["lineCount"] >= total:
+            return
+        
+        next_params = {**params, "page": params["page"] + 1}
+        task = asyncio.create_task(self._prefetch_positions_history(next_params))
+        _PREFETCH_TASKS.add(task)
+        task.add_done_callback(_PREFETCH_TASKS.discard)
+    
+    async def _prefetch_positions_history(self, params: Dict[str, Any]) -> None:
+        """Précharge une page de résultats dans le cache, sans propager les erreurs"""
+        try:
+            await self._get_positions_history(params)
+        except Exception as e:
+            logger.warning(f"⚠️ Préchargement de la page {params['page']} impossible: {str(e)}")
+    
     def _analyze_history_positions_results(self, response: Dict[str, Any], input_domain: str, date_from: str, date_to: str) -> Dict[str, Any]:
         """Analyse et synthèse des résultats de l'historique des positions"""
         try:
             results = response.get("results", [])
-            total_count = response.get("total_result_count", 0)
-            filtered_count = response.get("filtered_result_count", 0)
-            returned_count = response.get("returned_result_count", 0)
-            
             if not results:
                 return {
                     "summary": f"Aucune donnée historique trouvée pour {input_domain} entre {date_from} et {date_to}",
@@ -180,139 +470,155 @@ class DomainsHistoryPositionsTool(BaseMCPTool):
                     "keywords": []
                 }
             
-            # Analyse des métriques globales
-            total_traffic = sum(result.get("most_recent_traffic", 0) for result in results)
-            active_keywords = sum(1 for result in results if result.get("still_there", False))
-            lost_keywords = returned_count - active_keywords
-            
-            # Analyse des positions
-            best_positions = [result.get("best_position", 100) for result in results if result.get("best_position")]
-            worst_positions = [result.get("worst_position", 1) for result in results if result.get("worst_position")]
-            current_positions = [result.get("most_recent_position", 100) for result in results if result.get("most_recent_position")]
-            
-            # Analyse des volumes
-            volumes = [result.get("volume", 0) for result in results if result.get("volume", 0) > 0]
-            
-            # Analyse des mots-clés individuels
-            analyzed_keywords = []
-            for result in results:
-                keyword_analysis = {
-                    "keyword": result.get("keyword", ""),
-                    "url": result.get("url", ""),
-                    "current_position": result.get("most_recent_position"),
-                    "best_position": result.get("best_position"),
-                    "worst_position": result.get("worst_position"),
-                    "current_traffic": result.get("most_recent_traffic", 0),
-                    "volume": result.get("volume", 0),
-                    "cpc": result.get("cpc", 0),
-                    "competition": result.get("competition"),
-                    "still_ranking": result.get("still_there", False),
-                    "first_seen": result.get("first_time_seen", ""),
-                    "last_seen": result.get("last_time_seen", ""),
-                    "times_seen": result.get("times_seen", 0),
-                    "performance_trend": self._calculate_performance_trend(result)
-                }
-                analyzed_keywords.append(keyword_analysis)
-            
-            # Statistiques globales
-            stats = {
-                "total_keywords_found": total_count,
-                "keywords_analyzed": returned_count,
-                "active_keywords": active_keywords,
-                "lost_keywords": lost_keywords,
-                "retention_rate": f"{(active_keywords/returned_count)*100:.1f}%" if returned_count > 0 else "0%",
-                "total_current_traffic": total_traffic,
-                "average_traffic_per_keyword": total_traffic // returned_count if returned_count > 0 else 0
-            }
-            
-            if best_positions:
-                stats["position_stats"] = {
-                    "best_position_achieved": min(best_positions),
-                    "average_best_position": sum(best_positions) / len(best_positions),
-                    "average_current_position": sum(current_positions) / len(current_positions) if current_positions else 0
-                }
-            
-            if volumes:
-                stats["volume_stats"] = {
-                    "total_volume": sum(volumes),
-                    "average_volume": sum(volumes) // len(volumes),
-                    "max_volume": max(volumes)
-                }
-            
-            return {
-                "summary": f"Analyse historique de {returned_count} mots-clés pour {input_domain}",
-                "domain": input_domain,
-                "period": {"from": date_from, "to": date_to},
-                "statistics": stats,
-                "keywords": analyzed_keywords,
-                "recommendations": self._generate_history_recommendations(analyzed_keywords, stats),
-                "response_metadata": {
-                    "response_time": response.get("response_time", ""),
-                    "total_results": total_count,
-                    "filtered_results": filtered_count,
-                    "remaining_results": response.get("remaining_result_count", 0)
-                }
-            }
+            analyzed_keywords, totals = self._analyze_keywords(results)
+            return self._summarize_history(response, totals, analyzed_keywords, input_domain, date_from, date_to)
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'analyse des résultats: {str(e)}")
             return {"error": f"Erreur lors de l'analyse des résultats: {str(e)}"}
     
-    def _calculate_performance_trend(self, result: Dict[str, Any]) -> str:
-        """Calcule la tendance de performance d'un mot-clé"""
-        best_pos = result.get("best_position")
-        current_pos = result.get("most_recent_position")
-        still_there = result.get("still_there", False)
-        
-        if not still_there:
-            return "lost"
+    @staticmethod
+    def _analyze_keywords(results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], _PositionTotals]:
+        """Analyse chaque mot-clé et retourne leurs détails avec les agrégats cumulés au passage"""
+        # Extraction des champs de chaque mot-clé
+        rows = []
+        for result in results:
+            try:
+                rows.append(_KEYWORD_FIELDS(result))
+            except KeyError:
+                # Ligne incomplète : valeurs par défaut pour les champs absents
+                rows.append(_KEYWORD_FIELDS({**_KEYWORD_DEFAULTS, **result}))
         
-        if not best_pos or not current_pos:
-            return "stable"
+        # Analyse des mots-clés individuels, agrégats et tendances cumulés au passage
+        analyzed_keywords = []
+        improving_count = declining_count = 0
+        total_traffic = active_keywords = 0
+        best_n = best_sum = current_n = current_sum = 0
+        best_min = None
+        volume_n = volume_sum = volume_max = 0
+        for (keyword, url, current_position, best_position, worst_position, traffic, volume,
+             cpc, competition, still_there, first_seen, last_seen, times_seen) in rows:
+            total_traffic += traffic
+            if best_position:
+                best_n += 1
+                best_sum += best_position
+                if best_min is None or best_position < best_min:
+                    best_min = best_position
+            if current_position:
+                current_n += 1
+                current_sum += current_position
+            if volume > 0:
+                volume_n += 1
+                volume_sum += volume
+                if volume > volume_max:
+                    volume_max = volume
+            
+            # Tendance de performance du mot-clé
+            if not still_there:
+                performance_trend = "lost"
+            else:
+                active_keywords += 1
+                if not best_position or not current_position:
+                    performance_trend = "stable"
+                elif current_position < best_position:
+                    performance_trend = "improving"
+                    improving_count += 1
+                elif current_position > best_position:
+                    performance_trend = "declining"
+                    declining_count += 1
+                else:
+                    performance_trend = "stable"
+            
+            analyzed_keywords.append({
+                "keyword": keyword,
+                "url": url,
+                "current_position": current_position,
+                "best_position": best_position,
+                "worst_position": worst_position,
+                "current_traffic": traffic,
+                "volume": volume,
+                "cpc": cpc,
+                "competition": competition,
+                "still_ranking": still_there,
+                "first_seen": first_seen,
+                "last_seen": last_seen,
+                "times_seen": times_seen,
+                "performance_trend": performance_trend
+            })
         
-        if current_pos < best_pos:
-            return "improving"
-        elif current_pos > best_pos:
-            return "declining"
-        else:
-            return "stable"
+        totals = _PositionTotals(
+            len(rows), improving_count, declining_count, total_traffic, active_keywords,
+            best_n, best_sum, best_min, current_n, current_sum, volume_n, volume_sum, volume_max
+        )
+        return analyzed_keywords, totals
     
-    def _generate_history_recommendations(self, keywords: List[Dict[str, Any]], stats: Dict[str, Any]) -> List[str]:
-        """Génère des recommandations basées sur l'analyse historique"""
-        recommendations = []
-        
-        if not keywords:
-            return ["Aucune donnée historique disponible pour cette période"]
+    def _summarize_history(self, response: Dict[str, Any], totals: _PositionTotals,
+                           analyzed_keywords: List[Dict[str, Any]], input_domain: str,
+                           date_from: str, date_to: str) -> Dict[str, Any]:
+        """Statistiques, recommandations et métadonnées calculées à partir des agrégats"""
+        (total_count, filtered_count, returned_count,
+         remaining_count, response_time) = _RESPONSE_FIELDS({**_RESPONSE_DEFAULTS, **response})
+        total_traffic = totals.traffic
+        active_keywords = totals.active
+        lost_keywords = returned_count - active_keywords
         
-        # Analyse du taux de rétention
-        retention_rate = float(stats.get("retention_rate", "0%").replace("%", ""))
-        if retention_rate > 80:
-            recommendations.append("🎯 Excellent taux de rétention des positions, votre SEO est stable")
-        elif retention_rate < 50:
-            recommendations.append("⚠️ Taux de rétention faible, analysez les causes de perte de positions")
+        # Taux de rétention, conservé en valeur numérique pour les recommandations
+        retention_value = round((active_keywords / returned_count) * 100, 1) if returned_count > 0 else 0.0
         
-        # Analyse des tendances
-        improving_count = sum(1 for kw in keywords if kw["performance_trend"] == "improving")
-        declining_count = sum(1 for kw in keywords if kw["performance_trend"] == "declining")
+        # Statistiques globales
+        stats = {
+            "total_keywords_found": total_count,
+            "keywords_analyzed": returned_count,
+            "active_keywords": active_keywords,
+            "lost_keywords": lost_keywords,
+            "retention_rate": f"{retention_value:.1f}%" if returned_count > 0 else "0%",
+            "retention_rate_value": retention_value,
+            "total_current_traffic": total_traffic,
+            "average_traffic_per_keyword": total_traffic // returned_count if returned_count > 0 else 0
+        }
         
-        if improving_count > declining_count:
-            recommendations.append("📈 Plus de mots-clés en progression qu'en déclin, tendance positive")
-        elif declining_count > improving_count:
-            recommendations.append("📉 Attention: plus de mots-clés en déclin, révision SEO nécessaire")
+        if totals.best_n:
+            stats["position_stats"] = {
+                "best_position_achieved": totals.best_min,
+                "average_best_position": totals.best_sum / totals.best_n,
+                "average_current_position": totals.current_sum / totals.current_n if totals.current_n else 0
+            }
         
-        # Analyse du trafic
-        avg_traffic = stats.get("average_traffic_per_keyword", 0)
-        if avg_traffic > 100:
-            recommendations.append("🚀 Bon trafic moyen par mot-clé, optimisez les top performers")
-        elif avg_traffic < 10:
-            recommendations.append("🔧 Trafic faible, concentrez-vous sur les mots-clés à fort volume")
+        if totals.volume_n:
+            stats["volume_stats"] = {
+                "total_volume": totals.volume_sum,
+                "average_volume": totals.volume_sum // totals.volume_n,
+                "max_volume": totals.volume_max
+            }
         
-        # Recommandations sur les positions
-        if "position_stats" in stats:
-            avg_current = stats["position_stats"].get("average_current_position", 0)
-            if avg_current > 20:
-                recommendations.append("📊 Positions moyennes élevées, travaillez l'optimisation on-page")
-            elif avg_current < 10:
-                recommendations.append("🏆 Bonnes positions moyennes, maintenez vos efforts SEO")
+        return {
+            "summary": f"Analyse historique de {returned_count} mots-clés pour {input_domain}",
+            "domain": input_domain,
+            "period": {"from": date_from, "to": date_to},
+            "statistics": stats,
+            "keywords": analyzed_keywords,
+            "recommendations": self._generate_history_recommendations(
+                totals.keywords, stats, totals.improving, totals.declining
+            ),
+            "response_metadata": {
+                "response_time": response_time,
+                "total_results": total_count,
+                "filtered_results": filtered_count,
+                "remaining_results": remaining_count
+            }
+        }
+    
+    def _generate_history_recommendations(self, keyword_count: int, stats: Dict[str, Any],
+                                          improving_count: int, declining_count: int) -> List[str]:
+        """Génère des recommandations basées sur l'analyse historique"""
+        if not keyword_count:
+            return ["Aucune donnée historique disponible pour cette période"]
         
-        return recommendations if recommendations else ["📊 Analyse historique terminée, consultez les données détaillées"]
+        position_stats = stats.get("position_stats")
+        return list(_history_recommendations(
+            bisect_right(_RETENTION_THRESHOLDS, stats.get("retention_rate_value", 0.0)),
+            (improving_count > declining_count) - (improving_count < declining_count) + 1,
+            bisect_right(_TRAFFIC_THRESHOLDS, stats.get("average_traffic_per_keyword", 0)),
+            bisect_right(_POSITION_THRESHOLDS, position_stats.get("average_current_position", 0))
+            if position_stats is not None else None
+        ))
@@ -3,13 +3,322 @@ MCP Tool pour l'endpoint Haloscan domains/keywords
 Permet d'analyser les positions d'un domaine sur des mots-clés spécifiques
 """
 
-from typing import Dict, Any, List, Optional
-from ...base import BaseMCPTool
+from bisect import bisect_right
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from ...base import BaseMCPTool, tool_schema
+from ....cache import SingleFlight, TTLCache, make_cache_key
+from ....config import Config
 from ....dependencies import HaloscanClient
 from ....logging_config import get_logger
 
 logger = get_logger("domains_keywords_tool")
 
+# Réponses domains/keywords récentes et requêtes en cours, partagées entre les appels identiques
+_RESPONSE_CACHE = TTLCache(ttl=Config.HALOSCAN_CACHE_TTL, maxsize=512)
+_RESPONSE_TTL = 15 * 60
+_INFLIGHT_REQUESTS = SingleFlight()
+
+# Modes pour lesquels seul l'hôte de 'input' est pris en compte par l'API
+_HOST_MODES = frozenset({"domain", "root"})
+
+# Champs lus pour chaque mot-clé positionné, avec leurs valeurs par défaut
+_KEYWORD_DEFAULTS: Dict[str, Any] = {
+    "keyword": "",
+    "url": "",
+    "position": None,
+    "traffic": 0,
+    "volume": 0,
+    "cpc": 0,
+    "competition": None,
+    "kgr": None,
+    "allintitle": None,
+    "result_count": 0,
+    "word_count": 0,
+    "last_scrap": "",
+    "page_first_seen_date": ""
+}
+_KEYWORD_FIELDS = itemgetter(*_KEYWORD_DEFAULTS)
+
+# Filtres optionnels transmis tels quels à l'API
+_OPTIONAL_FILTERS = frozenset({
+    "volume_min", "volume_max", "cpc_min", "cpc_max",
+    "competition_min", "competition_max", "kgr_min", "kgr_max",
+    "kvi_min", "kvi_max", "kvi_keep_na",
+    "allintitle_min", "allintitle_max", "position_min", "position_max",
+    "traffic_min", "traffic_max", "title_word_count_min", "title_word_count_max",
+    "serp_date_min", "serp_date_max", "keyword_include", "keyword_exclude",
+    "title_include", "title_exclude"
+})
+
+# Nombre maximal d'analyses de domaines menées en parallèle (inputs)
+_MULTI_DOMAIN_CONCURRENCY = 8
+
+# Recommandations fixes et modèles formatés uniquement lorsque la règle s'applique
+_NO_POSITIONS_RECOMMENDATION = "Aucune position trouvée pour les mots-clés analysés"
+_DEFAULT_RECOMMENDATION = "📊 Analyse des mots-clés terminée, consultez les données détaillées"
+_LOW_COVERAGE_TEMPLATE = "⚠️ Seulement {:.0f}% des mots-clés ont des positions, travaillez votre SEO"
+_HIGH_COVERAGE_TEMPLATE = "🎯 Excellente couverture: {:.0f}% des mots-clés positionnés"
+_MISSING_KEYWORDS_TEMPLATE = "🔍 {} mots-clés sans position: {}{}"
+
+
+def _canonical_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Forme normalisée des paramètres servant de clé de cache
+    
+    Les mots-clés forment un ensemble trié (casse, espaces, ordre et doublons ignorés) : les
+    variantes d'une même demande partagent ainsi la même réponse. En mode domain ou root, seul
+    l'hôte est normalisé (schéma retiré, minuscules, « / » final seul ignoré) ; ailleurs,
+    l'URL est conservée telle quelle, son chemin pouvant être sensible à la casse. Le préfixe
+    www est conservé, Haloscan distinguant www.exemple.com de exemple.com.
+    """
+    target = params["input"]
+    if params.get("mode") in _HOST_MODES:
+        scheme_end = target.find("://")
+        if scheme_end != -1:
+            target = target[scheme_end + 3:]
+        host, _, path = target.partition("/")
+        target = f"{host.lower()}/{path}" if path else host.lower()
+    
+    return {
+        **params,
+        "input": target,
+        "keywords": sorted({keyword.strip().lower() for keyword in params["keywords"]})
+    }
+
+
+def _keyword_rows(results: List[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+    """Extrait les champs de chaque mot-clé positionné (valeurs par défaut pour les champs absents)"""
+    rows = []
+    for result in results:
+        try:
+            rows.append(_KEYWORD_FIELDS(result))
+        except KeyError:
+            rows.append(_KEYWORD_FIELDS({**_KEYWORD_DEFAULTS, **result}))
+    return rows
+
+
+def _keyword_entries(rows: Iterable[Tuple[Any, ...]]) -> Iterator[Dict[str, Any]]:
+    """Produit l'analyse de chaque mot-clé (catégorie et valeur commerciale calculées sur place)"""
+    for (keyword, url, position, traffic, volume, cpc, competition, kgr, allintitle,
+         result_count, word_count, last_scrap, page_first_seen) in rows:
+        # Catégorie de performance (position inconnue : considérée comme la 100e)
+        rank = 100 if position is None else position
+        if rank <= 10 and traffic > 0:
+            # Top performer: position <= 10 et trafic > 0
+            performance_category = "top_performer"
+        elif 11 <= rank <= 50 and volume > 100:
+            # Opportunité: position 11-50 avec bon volume
+            performance_category = "opportunity"
+        elif rank <= 20 and volume < 100:
+            # Long tail: position correcte mais faible volume
+            performance_category = "long_tail"
+        elif rank > 50:
+            # Needs work: position > 50
+            performance_category = "needs_work"
+        else:
+            performance_category = "average"
+        
+        # Valeur commerciale basée sur: volume, CPC, compétition, trafic actuel
+        volume_score = min(volume / 1000, 25)  # Max 25 points
+        cpc_score = min(cpc * 5, 25) if cpc else 0  # Max 25 points
+        competition_score = competition * 15 if competition else 0  # Max 15 points
+        traffic_score = min(traffic / 100, 35)  # Max 35 points
+        commercial_value = round(volume_score + cpc_score + competition_score + traffic_score, 2)
+        
+        yield {
+            "keyword": keyword,
+            "url": url,
+            "position": position,
+            "traffic": traffic,
+            "volume": volume,
+            "cpc": cpc,
+            "competition": competition,
+            "kgr": kgr,
+            "allintitle": allintitle,
+            "result_count": result_count,
+            "word_count": word_count,
+            "last_scrap": last_scrap,
+            "page_first_seen": page_first_seen,
+            "performance_category": performance_category,
+            "commercial_value": commercial_value
+        }
+
+
+# Définition OpenAI de l'outil, construite une seule fois à l'import
+_TOOL_DEFINITION: Dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "domains_keywords",
+        "description": "Analyze how a domain performs on specific keywords with detailed position, traffic, and SEO metrics for each keyword.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "input": {
+                    "type": "string",
+                    "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
+                },
+                "inputs": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Additional domains or URLs to score on the same keywords together with 'input'. Requests are sent concurrently and analyses are returned per domain",
+                    "maxItems": 10
+                },
+                "keywords": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Array of keywords to analyze (e.g., ['keyword 1', 'keyword 2'])",
+                    "minItems": 1
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["auto", "root", "domain", "url"],
+                    "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
+                    "default": "auto"
+                },
+                "lineCount": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return",
+                    "default": 20,
+                    "minimum": 1,
+                    "maximum": 100
+                },
+                "page": {
+                    "type": "integer",
+                    "description": "Page number for pagination",
+                    "default": 1,
+                    "minimum": 1
+                },
+                "order_by": {
+                    "type": "string",
+                    "enum": ["default", "keyword", "volume", "cpc", "competition", "kgr", "allintitle"],
+                    "description": "Field used for sorting results",
+                    "default": "default"
+                },
+                "order": {
+                    "type": "string",
+                    "enum": ["asc", "desc"],
+                    "description": "Whether the results are sorted in ascending or descending order",
+                    "default": "asc"
+                },
+                "volume_min": {
+                    "type": "integer",
+                    "description": "Minimum search volume filter",
+                    "minimum": 0
+                },
+                "volume_max": {
+                    "type": "integer",
+                    "description": "Maximum search volume filter",
+                    "minimum": 0
+                },
+                "cpc_min": {
+                    "type": "number",
+                    "description": "Minimum cost per click filter",
+                    "minimum": 0
+                },
+                "cpc_max": {
+                    "type": "number",
+                    "description": "Maximum cost per click filter",
+                    "minimum": 0
+                },
+                "competition_min": {
+                    "type": "number",
+                    "description": "Minimum competition level (0-1)",
+                    "minimum": 0,
+                    "maximum": 1
+                },
+                "competition_max": {
+                    "type": "number",
+                    "description": "Maximum competition level (0-1)",
+                    "minimum": 0,
+                    "maximum": 1
+                },
+                "kgr_min": {
+                    "type": "number",
+                    "description": "Minimum Keyword Golden Ratio",
+                    "minimum": 0
+                },
+                "kgr_max": {
+                    "type": "number",
+                    "description": "Maximum Keyword Golden Ratio",
+                    "minimum": 0
+                },
+                "kvi_min": {
+                    "type": "number",
+                    "description": "Minimum Keyword Value Index",
+                    "minimum": 0
+                },
+                "kvi_max": {
+                    "type": "number",
+                    "description": "Maximum Keyword Value Index",
+                    "minimum": 0
+                },
+                "allintitle_min": {
+                    "type": "integer",
+                    "description": "Minimum allintitle count",
+                    "minimum": 0
+                },
+                "allintitle_max": {
+                    "type": "integer",
+                    "description": "Maximum allintitle count",
+                    "minimum": 0
+                },
+                "position_min": {
+                    "type": "integer",
+                    "description": "Minimum position filter (1 = best)",
+                    "minimum": 1,
+                    "maximum": 100
+                },
+                "position_max": {
+                    "type": "integer",
+                    "description": "Maximum position filter (100 = worst)",
+                    "minimum": 1,
+                    "maximum": 100
+                },
+                "traffic_min": {
+                    "type": "integer",
+                    "description": "Minimum traffic filter",
+                    "minimum": 0
+                },
+                "traffic_max": {
+                    "type": "integer",
+                    "description": "Maximum traffic filter",
+                    "minimum": 0
+                },
+                "title_word_count_min": {
+                    "type": "integer",
+                    "description": "Minimum number of words in keyword",
+                    "minimum": 1
+                },
+                "title_word_count_max": {
+                    "type": "integer",
+                    "description": "Maximum number of words in keyword",
+                    "minimum": 1
+                },
+                "keyword_include": {
+                    "type": "string",
+                    "description": "Regular expression for keywords to be included"
+                },
+                "keyword_exclude": {
+                    "type": "string",
+                    "description": "Regular expression for keywords to be excluded"
+                },
+                "title_include": {
+                    "type": "string",
+                    "description": "Regular expression for titles to be included"
+                },
+                "title_exclude": {
+                    "type": "string",
+                    "description": "Regular expression for titles to be excluded"
+                }
+            },
+            "required": ["input", "keywords"]
+        }
+    }
+}
+
+
+@tool_schema(_TOOL_DEFINITION)
 class DomainsKeywordsTool(BaseMCPTool):
     """Outil MCP pour analyser les positions d'un domaine sur des mots-clés spécifiques via l'API Haloscan"""
     
@@ -17,226 +326,112 @@ class DomainsKeywordsTool(BaseMCPTool):
         self.haloscan_client = haloscan_client
         self.tool_name = "domainskeywords"
         
-    def get_tool_definition(self) -> Dict[str, Any]:
-        """Définition OpenAI de l'outil pour l'analyse des mots-clés d'un domaine"""
-        return {
-            "type": "function",
-            "function": {
-                "name": "domains_keywords",
-                "description": "Analyze how a domain performs on specific keywords with detailed position, traffic, and SEO metrics for each keyword.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "input": {
-                            "type": "string",
-                            "description": "The domain or URL to analyze (e.g., 'example.com' or 'https://example.com')"
-                        },
-                        "keywords": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Array of keywords to analyze (e.g., ['keyword 1', 'keyword 2'])",
-                            "minItems": 1
-                        },
-                        "mode": {
-                            "type": "string",
-                            "enum": ["auto", "root", "domain", "url"],
-                            "description": "Whether to look for a domain or a full URL. Leave empty for auto detection",
-                            "default": "auto"
-                        },
-                        "lineCount": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return",
-                            "default": 20,
-                            "minimum": 1,
-                            "maximum": 100
-                        },
-                        "page": {
-                            "type": "integer",
-                            "description": "Page number for pagination",
-                            "default": 1,
-                            "minimum": 1
-                        },
-                        "order_by": {
-                            "type": "string",
-                            "enum": ["default", "keyword", "volume", "cpc", "competition", "kgr", "allintitle"],
-                            "description": "Field used for sorting results",
-                            "default": "default"
-                        },
-                        "order": {
-                            "type": "string",
-                            "enum": ["asc", "desc"],
-                            "description": "Whether the results are sorted in ascending or descending order",
-                            "default": "asc"
-                        },
-                        "volume_min": {
-                            "type": "integer",
-                            "description": "Minimum search volume filter",
-                            "minimum": 0
-                        },
-                        "volume_max": {
-                            "type": "integer",
-                            "description": "Maximum search volume filter",
-                            "minimum": 0
-                        },
-                        "cpc_min": {
-                            "type": "number",
-                            "description": "Minimum cost per click filter",
-                            "minimum": 0
-                        },
-                        "cpc_max": {
-                            "type": "number",
-                            "description": "Maximum cost per click filter",
-                            "minimum": 0
-                        },
-                        "competition_min": {
-                            "type": "number",
-                            "description": "Minimum competition level (0-1)",
-                            "minimum": 0,
-                            "maximum": 1
-                        },
-                        "competition_max": {
-                            "type": "number",
-                            "description": "Maximum competition level (0-1)",
-                            "minimum": 0,
-                            "maximum": 1
-                        },
-                        "kgr_min": {
-                            "type": "number",
-                            "description": "Minimum Keyword Golden Ratio",
-                            "minimum": 0
-                        },
-                        "kgr_max": {
-                            "type": "number",
-                            "description": "Maximum Keyword Golden Ratio",
-                            "minimum": 0
-                        },
-                        "kvi_min": {
-                            "type": "number",
-                            "description": "Minimum Keyword Value Index",
-                            "minimum": 0
-                        },
-                        "kvi_max": {
-                            "type": "number",
-                            "description": "Maximum Keyword Value Index",
-                            "minimum": 0
-                        },
-                        "allintitle_min": {
-                            "type": "integer",
-                            "description": "Minimum allintitle count",
-                            "minimum": 0
-                        },
-                        "allintitle_max": {
-                            "type": "integer",
-                            "description": "Maximum allintitle count",
-                            "minimum": 0
-                        },
-                        "position_min": {
-                            "type": "integer",
-                            "description": "Minimum position filter (1 = best)",
-                            "minimum": 1,
-                            "maximum": 100
-                        },
-                        "position_max": {
-                            "type": "integer",
-                            "description": "Maximum position filter (100 = worst)",
-                            "minimum": 1,
-                            "maximum": 100
-                        },
-                        "traffic_min": {
-                            "type": "integer",
-                            "description": "Minimum traffic filter",
-                            "minimum": 0
-                        },
-                        "traffic_max": {
-                            "type": "integer",
-                            "description": "Maximum traffic filter",
-                            "minimum": 0
-                        },
-                        "title_word_count_min": {
-                            "type": "integer",
-                            "description": "Minimum number of words in keyword",
-                            "minimum": 1
-                        },
-                        "title_word_count_max": {
-                            "type": "integer",
-                            "description": "Maximum number of words in keyword",
-                            "minimum": 1
-                        },
-                        "keyword_include": {
-                            "type": "string",
-                            "description": "Regular expression for keywords to be included"
-                        },
-                        "keyword_exclude": {
-                            "type": "string",
-                            "description": "Regular expression for keywords to be excluded"
-                        },
-                        "title_include": {
-                            "type": "string",
-                            "description": "Regular expression for titles to be included"
-                        },
-                        "title_exclude": {
-                            "type": "string",
-                            "description": "Regular expression for titles to be excluded"
-                        }
-                    },
-                    "required": ["input", "keywords"]
-                }
-            }
-        }
-    
     async def execute(self, **kwargs) -> Dict[str, Any]:
         """Exécute l'analyse des mots-clés d'un domaine"""
         try:
             # Validation des paramètres requis
-            input_domain = kwargs.get("input", "").strip()
-            keywords = kwargs.get("keywords", [])
-            
-            if not input_domain:
-                return {"error": "Le paramètre 'input' (domaine) est requis"}
-            if not keywords or not isinstance(keywords, list):
-                return {"error": "Le paramètre 'keywords' est requis et doit être une liste de mots-clés"}
-            
-            # Préparation des paramètres
-            params = {
-                "input": input_domain,
-                "keywords": keywords,
-                "mode": kwargs.get("mode", "auto"),
-                "lineCount": kwargs.get("lineCount", 20),
-                "page": kwargs.get("page", 1),
-                "order_by": kwargs.get("order_by", "default"),
-                "order": kwargs.get("order", "asc")
-            }
-            
-            # Ajout des filtres optionnels
-            optional_filters = [
-                "volume_min", "volume_max", "cpc_min", "cpc_max",
-                "competition_min", "competition_max", "kgr_min", "kgr_max",
-                "kvi_min", "kvi_max", "kvi_keep_na",
-                "allintitle_min", "allintitle_max", "position_min", "position_max",
-                "traffic_min", "traffic_max", "title_word_count_min", "title_word_count_max",
-                "serp_date_min", "serp_date_max", "keyword_include", "keyword_exclude",
-                "title_include", "title_exclude"
-            ]
-            
-            for filter_param in optional_filters:
-                if filter_param in kwargs and kwargs[filter_param] is not None:
-                    params[filter_param] = kwargs[filter_param]
+            required, error = self._validate(kwargs)
+            if error:
+                return {"error": error}
+            input_domain, keywords = required
             
-            logger.info(f"🔍 Analyse des mots-clés pour {input_domain}: {', '.join(keywords[:3])}{'...' if len(keywords) > 3 else ''}")
+            # Plusieurs domaines : analyses lancées ensemble
+            extra_domains = [domain.strip() for domain in kwargs.get("inputs") or [] if domain and domain.strip()]
+            if extra_domains:
+                return await self._execute_many([input_domain, *extra_domains], keywords, kwargs)
             
-            # Appel à l'API Haloscan
-            response = await self.haloscan_client.post_async("domains/keywords", params)
-            
-            if not response:
-                return {"error": "Aucune réponse de l'API Haloscan"}
-            
-            # Analyse et synthèse des résultats
-            return self._analyze_domain_keywords_results(response, input_domain, keywords)
+            return await self._execute_one(input_domain, keywords, kwargs)
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'analyse des mots-clés du domaine: {str(e)}")
             return {"error": f"Erreur lors de l'analyse des mots-clés du domaine: {str(e)}"}
     
+    async def _execute_one(self, input_domain: str, keywords: List[str], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Récupère et analyse les positions d'un domaine sur les mots-clés demandés"""
+        params = self._build_params(input_domain, keywords, kwargs)
+        
+        logger.info(f"🔍 Analyse des mots-clés pour {input_domain}: {', '.join(keywords[:3])}{'...' if len(keywords) > 3 else ''}")
+        
+        # Appel à l'API Haloscan (réponse en cache sauf si _no_cache est demandé)
+        response = await self._get_domain_keywords(params, use_cache=not kwargs.get("_no_cache"))
+        
+        if not response:
+            return {"error": "Aucune réponse de l'API Haloscan"}
+        
+        # Analyse et synthèse des résultats
+        return self._analyze_domain_keywords_results(response, input_domain, keywords)
+    
+    async def _execute_many(self, domains: List[str], keywords: List[str], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyse plusieurs domaines sur les mêmes mots-clés en parallèle (concurrence bornée)"""
+        domains = list(dict.fromkeys(domains))
+        logger.info(f"🔍 Analyse des mots-clés pour {len(domains)} domaine(s)")
+        
+        results_by_domain = await self._execute_per_domain(
+            domains,
+            lambda domain: self._execute_one(domain, keywords, kwargs),
+            "Erreur lors de l'analyse des mots-clés du domaine",
+            concurrency=_MULTI_DOMAIN_CONCURRENCY
+        )
+        
+        return {
+            "summary": f"Analyse de {len(keywords)} mots-clés pour {len(domains)} domaine(s)",
+            "domains": domains,
+            "requested_keywords": keywords,
+            "results_by_domain": results_by_domain
+        }
+    
+    @staticmethod
+    def _build_params(input_domain: str, keywords: List[str], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Prépare les paramètres de la requête API"""
+        params = {
+            "input": input_domain,
+            "keywords": keywords,
+            "mode": kwargs.get("mode", "auto"),
+            "lineCount": kwargs.get("lineCount", 20),
+            "page": kwargs.get("page", 1),
+            "order_by": kwargs.get("order_by", "default"),
+            "order": kwargs.get("order", "asc")
+        }
+        
+        # Ajout des filtres optionnels renseignés
+        params.update(
+            (filter_param, kwargs[filter_param])
+            for filter_param in kwargs.keys() & _OPTIONAL_FILTERS
+            if kwargs[filter_param] is not None
+        )
+        
+        return params
+    
+    @staticmethod
+    def _validate(kwargs: Dict[str, Any]) -> Tuple[Tuple[Any, ...], Optional[str]]:
+        """Valide les paramètres requis et retourne (domaine, mots-clés), ou le message d'erreur"""
+        input_domain = kwargs.get("input", "").strip()
+        if not input_domain:
+            return (), "Le paramètre 'input' (domaine) est requis"
+        
+        keywords = kwargs.get("keywords", [])
+        if not keywords or not isinstance(keywords, list):
+            return (), "Le paramètre 'keywords' est requis et doit être une liste de mots-clés"
+        
+        return (input_domain, keywords), None
+    
+    async def _get_domain_keywords(self, params: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+        """Retourne la réponse domains/keywords depuis le cache, ou l'appel en cours, ou un nouvel appel"""
+        cache_key = make_cache_key("domains/keywords", _canonical_params(params))
+        response = _RESPONSE_CACHE.get(cache_key) if use_cache else None
+        if response is None:
+            response = await _INFLIGHT_REQUESTS.run(
+                cache_key, lambda: self._fetch_domain_keywords(params, cache_key)
+            )
+        return response
+    
+    async def _fetch_domain_keywords(self, params: Dict[str, Any], cache_key: str) -> Dict[str, Any]:
+        """Appelle l'endpoint domains/keywords et met la réponse en cache"""
+        response = await self.haloscan_client.post_async("domains/keywords", params)
+        if response:
+            _RESPONSE_CACHE.set(cache_key, response, ttl=_RESPONSE_TTL)
+        return response
+    
     def _analyze_domain_keywords_results(self, response: Dict[str, Any], input_domain: str, keywords: List[str]) -> Dict[str, Any]:
         """Analyse et synthèse des résultats des mots-clés d'un domaine"""
         try:
@@ -256,50 +451,42 @@ class DomainsKeywordsTool(BaseMCPTool):
                     "keywords_analysis": []
                 }
             
-            # Analyse des métriques globales
-            total_traffic = sum(result.get("traffic", 0) for result in results)
-            total_volume = sum(result.get("volume", 0) for result in results)
+            # Extraction des champs de chaque mot-clé, puis agrégats calculés colonne par colonne
+            rows = _keyword_rows(results)
+            (keyword_column, _, position_column, traffic_column, volume_column,
+             cpc_column, competition_column, *_) = zip(*rows)
+            
+            total_traffic = sum(traffic_column)
+            total_volume = sum(volume_column)
             
-            # Analyse des positions
-            positions = [result.get("position", 100) for result in results if result.get("position")]
-            top_3_count = sum(1 for pos in positions if pos <= 3)
-            top_10_count = sum(1 for pos in positions if pos <= 10)
-            top_50_count = sum(1 for pos in positions if pos <= 50)
+            # Analyse des positions (triées : chaque seuil est compté par bisection)
+            positions = sorted(filter(None, position_column))
+            top_3_count = bisect_right(positions, 3)
+            top_10_count = bisect_right(positions, 10)
+            top_50_count = bisect_right(positions, 50)
             
             # Analyse des CPC et compétition
-            cpcs = [result.get("cpc", 0) for result in results if result.get("cpc", 0) > 0]
-            competitions = [result.get("competition", 0) for result in results if result.get("competition") is not None]
+            cpcs = [cpc for cpc in cpc_column if cpc > 0]
+            competitions = [competition for competition in competition_column if competition is not None]
             
-            # Analyse des mots-clés individuels
+            # Analyse des mots-clés individuels, répartis par catégorie au passage
             analyzed_keywords = []
-            for result in results:
-                keyword_analysis = {
-                    "keyword": result.get("keyword", ""),
-                    "url": result.get("url", ""),
-                    "position": result.get("position"),
-                    "traffic": result.get("traffic", 0),
-                    "volume": result.get("volume", 0),
-                    "cpc": result.get("cpc", 0),
-                    "competition": result.get("competition"),
-                    "kgr": result.get("kgr"),
-                    "allintitle": result.get("allintitle"),
-                    "result_count": result.get("result_count", 0),
-                    "word_count": result.get("word_count", 0),
-                    "last_scrap": result.get("last_scrap", ""),
-                    "page_first_seen": result.get("page_first_seen_date", ""),
-                    "performance_category": self._categorize_keyword_performance(result),
-                    "commercial_value": self._calculate_commercial_value(result)
-                }
+            top_performers = []
+            opportunities = []
+            commercial_keywords = []
+            for keyword_analysis in _keyword_entries(rows):
                 analyzed_keywords.append(keyword_analysis)
+                category = keyword_analysis["performance_category"]
+                if category == "top_performer":
+                    top_performers.append(keyword_analysis)
+                elif category == "opportunity":
+                    opportunities.append(keyword_analysis)
+                if keyword_analysis["commercial_value"] > 50:
+                    commercial_keywords.append(keyword_analysis)
             
-            # Identification des mots-clés par catégorie
-            top_performers = [kw for kw in analyzed_keywords if kw["performance_category"] == "top_performer"]
-            opportunities = [kw for kw in analyzed_keywords if kw["performance_category"] == "opportunity"]
-            commercial_keywords = [kw for kw in analyzed_keywords if kw["commercial_value"] > 50]
-            
-            # Mots-clés demandés vs trouvés
-            found_keywords = [result.get("keyword", "") for result in results]
-            missing_keywords = [kw for kw in keywords if kw not in found_keywords]
+            # Mots-clés demandés vs trouvés (casse et espaces ignorés)
+            found_keywords = {keyword.strip().lower() for keyword in keyword_column}
+            missing_keywords = [kw for kw in keywords if kw.strip().lower() not in found_keywords]
             
             # Statistiques globales
             stats = {
@@ -307,7 +494,7 @@ class DomainsKeywordsTool(BaseMCPTool):
                 "total_keywords_found": total_keyword_count,
                 "keywords_analyzed": returned_count,
                 "requested_keywords": len(keywords),
-                "found_keywords": len(found_keywords),
+                "found_keywords": len(keyword_column),
                 "missing_keywords": len(missing_keywords),
                 "total_traffic": total_traffic,
                 "total_volume": total_volume,
@@ -354,59 +541,20 @@ class DomainsKeywordsTool(BaseMCPTool):
             logger.error(f"❌ Erreur lors de l'analyse des résultats: {str(e)}")
             return {"error": f"Erreur lors de l'analyse des résultats: {str(e)}"}
     
-    def _categorize_keyword_performance(self, result: Dict[str, Any]) -> str:
-        """Catégorise la performance d'un mot-clé"""
-        position = result.get("position", 100)
-        traffic = result.get("traffic", 0)
-        volume = result.get("volume", 0)
-        
-        # Top performer: position <= 10 et trafic > 0
-        if position <= 10 and traffic > 0:
-            return "top_performer"
-        
-        # Opportunité: position 11-50 avec bon volume
-        if 11 <= position <= 50 and volume > 100:
-            return "opportunity"
-        
-        # Long tail: position correcte mais faible volume
-        if position <= 20 and volume < 100:
-            return "long_tail"
-        
-        # Needs work: position > 50
-        if position > 50:
-            return "needs_work"
-        
-        return "average"
-    
-    def _calculate_commercial_value(self, result: Dict[str, Any]) -> float:
-        """Calcule la valeur commerciale d'un mot-clé"""
-        volume = result.get("volume", 0)
-        cpc = result.get("cpc", 0)
-        competition = result.get("competition", 0)
-        traffic = result.get("traffic", 0)
-        
-        # Score basé sur: volume, CPC, compétition, trafic actuel
-        volume_score = min(volume / 1000, 25)  # Max 25 points
-        cpc_score = min(cpc * 5, 25) if cpc else 0  # Max 25 points
-        competition_score = competition * 15 if competition else 0  # Max 15 points
-        traffic_score = min(traffic / 100, 35)  # Max 35 points
-        
-        total_score = volume_score + cpc_score + competition_score + traffic_score
-        return round(total_score, 2)
-    
     def _generate_domain_keywords_recommendations(self, keywords: List[Dict[str, Any]], stats: Dict[str, Any], missing_keywords: List[str]) -> List[str]:
         """Génère des recommandations basées sur l'analyse des mots-clés du domaine"""
-        recommendations = []
+        found_count = stats.get("found_keywords", 0)
+        if not keywords or not found_count:
+            return [_NO_POSITIONS_RECOMMENDATION]
         
-        if not keywords:
-            return ["Aucune position trouvée pour les mots-clés analysés"]
+        recommendations = []
         
         # Analyse de la couverture
-        found_rate = (stats.get("found_keywords", 0) / stats.get("requested_keywords", 1)) * 100
+        found_rate = (found_count / stats.get("requested_keywords", 1)) * 100
         if found_rate < 50:
-            recommendations.append(f"⚠️ Seulement {found_rate:.0f}% des mots-clés ont des positions, travaillez votre SEO")
+            recommendations.append(_LOW_COVERAGE_TEMPLATE.format(found_rate))
         elif found_rate > 80:
-            recommendations.append(f"🎯 Excellente couverture: {found_rate:.0f}% des mots-clés positionnés")
+            recommendations.append(_HIGH_COVERAGE_TEMPLATE.format(found_rate))
         
         # Analyse des positions
         avg_position = stats.get("averages", {}).get("position", 0)
@@ -436,11 +584,13 @@ class DomainsKeywordsTool(BaseMCPTool):
         
         # Mots-clés manquants
         if missing_keywords:
-            recommendations.append(f"🔍 {len(missing_keywords)} mots-clés sans position: {', '.join(missing_keywords[:3])}{'...' if len(missing_keywords) > 3 else ''}")
+            recommendations.append(_MISSING_KEYWORDS_TEMPLATE.format(
+                len(missing_keywords), ", ".join(islice(missing_keywords, 3)), "..." if len(missing_keywords) > 3 else ""
+            ))
         
         # Recommandation sur les opportunités
         opportunities = stats.get("categories", {}).get("opportunities", 0)
         if opportunities > 0:
             recommendations.append(f"💡 {opportunities} opportunités d'amélioration identifiées")
         
-        return recommendations if recommendations else ["📊 Analyse des mots-clés terminée, consultez les données détaillées"]
+        return recommendations if recommendations else [_DEFAULT_RECOMMENDATION]
@@ -0,0 +1,49 @@
+"""
+Limiteur de débit asynchrone (seau à jetons) pour respecter le quota de l'API Haloscan
+"""
+import asyncio
+import time
+from typing import Optional
+
+
+class AsyncRateLimiter:
+    """Autorise au plus max_rate acquisitions par fenêtre de period secondes
+
+    Le seau contient max_rate jetons et se remplit en continu ; lorsqu'il est vide, les
+    appelants attendent leur tour (dans l'ordre d'arrivée) au lieu d'échouer.
+    Un max_rate nul ou négatif désactive la limitation.
+    """
+
+    def __init__(self, max_rate: float, period: float):
+        self.max_rate = max_rate
+        self.period = period
+        self._tokens = float(max_rate)
+        self._updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_rate, self._tokens + (now - self._updated_at) * self.max_rate / self.period)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Consomme un jeton, en attendant qu'il soit disponible si nécessaire"""
+        if self.max_rate <= 0:
+            return
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * self.period / self.max_rate)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
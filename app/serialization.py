@@ -0,0 +1,30 @@
+"""
+Sérialisation JSON rapide pour les clés de cache et les échanges avec l'API Haloscan
+Utilise orjson s'il est installé, sinon le module json de la bibliothèque standard
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel
+    orjson = None
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Sérialise un objet en JSON compact (UTF-8)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option, default=str)
+
+    return json.dumps(
+        obj, sort_keys=sort_keys, default=str, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Désérialise un document JSON (bytes ou str)"""
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
@@ -0,0 +1,103 @@
+"""
+Tests du cache à expiration (TTLCache) et du regroupement des appels concurrents (SingleFlight)
+"""
+import asyncio
+
+import pytest
+
+from app.cache import SingleFlight, TTLCache
+
+
+def test_concurrent_calls_share_one_result():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        results = await asyncio.gather(*(flight.run("key", call) for _ in range(5)))
+        return results, calls, len(flight)
+
+    results, calls, inflight = asyncio.run(scenario())
+    assert results == ["ok"] * 5
+    assert len(calls) == 1
+    assert inflight == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        leader = asyncio.ensure_future(flight.run("key", call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.run("key", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower, leader.cancelled(), calls
+
+    result, leader_cancelled, calls = asyncio.run(scenario())
+    assert result == "ok"
+    assert leader_cancelled
+    assert len(calls) == 1
+
+
+def test_exception_reaches_every_caller():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        return await asyncio.gather(*(flight.run("key", call) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+
+def test_key_is_released_after_failure():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        async def succeeding():
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await flight.run("key", failing)
+        return await flight.run("key", succeeding)
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_entry_ttl_is_bounded_by_cache_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl=60)
+    cache.set("long", "value", ttl=3600)
+    cache.set("short", "value", ttl=10)
+
+    now[0] += 30
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+
+    now[0] += 31
+    assert cache.get("long") is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TTLCache(ttl=0)
+    cache.set("key", "value", ttl=300)
+    assert cache.get("key") is None
+    assert len(cache) == 0
@@ -0,0 +1,119 @@
+"""
+Tests de l'outil domains_gmb_backlinks_categories : filtres entreprises, curseur et pages en échec
+"""
+import asyncio
+
+from app.mcp_tools.haloscan.domains.domains_gmb_backlinks_categories import DomainsGmbBacklinksCategoresTool
+
+
+class StubClient:
+    """Client Haloscan factice : une réponse par numéro de page, ou une exception"""
+
+    def __init__(self, pages, total_result_count=None):
+        self.pages = pages
+        self.total_result_count = total_result_count
+        self.sent = []
+
+    async def post_async(self, endpoint, data):
+        self.sent.append(dict(data))
+        page = self.pages[data["page"]]
+        if isinstance(page, Exception):
+            raise page
+        response = {"results": page}
+        if self.total_result_count is not None:
+            response["total_result_count"] = self.total_result_count
+        return response
+
+
+def _category(name, business_count, businesses):
+    return {"category": name, "business_count": business_count, "businesses": businesses}
+
+
+def _business(name, is_claimed, rating_value=4.5, rating_count=10):
+    return {"name": name, "is_claimed": is_claimed, "rating_value": rating_value, "rating_count": rating_count}
+
+
+def test_business_filters_drive_category_counts():
+    client = StubClient({1: [
+        _category("Restaurant", 10, [_business("a", 1), _business("b", 0)]),
+        _category("Bakery", 4, [_business("c", 0)])
+    ]})
+    tool = DomainsGmbBacklinksCategoresTool(client)
+
+    result = asyncio.run(tool.execute(input="filters.example", is_claimed=True))
+
+    categories = result["all_categories"]
+    assert [category["name"] for category in categories] == ["Restaurant"]
+    assert categories[0]["business_count"] == 1
+    assert categories[0]["reported_business_count"] == 10
+    assert categories[0]["claimed_rate"] == 100.0
+    assert result["global_statistics"]["total_businesses_analyzed"] == 1
+
+
+def test_counts_without_filters_come_from_the_api():
+    client = StubClient({1: [_category("Restaurant", 10, [_business("a", 1), _business("b", 0)])]})
+    tool = DomainsGmbBacklinksCategoresTool(client)
+
+    result = asyncio.run(tool.execute(input="nofilters.example"))
+
+    category = result["all_categories"][0]
+    assert category["business_count"] == 10
+    assert "reported_business_count" not in category
+    assert category["claimed_rate"] == 10.0
+
+
+def test_cursor_walks_pages_without_reaching_the_api():
+    pages = {page: [_category(f"Cat {page}", 1, [_business("a", 1)])] for page in (1, 2, 3)}
+    client = StubClient(pages, total_result_count=3)
+    tool = DomainsGmbBacklinksCategoresTool(client)
+
+    async def scenario():
+        visited = []
+        cursor = None
+        while True:
+            arguments = {"input": "cursor.example", "lineCount": 1}
+            if cursor:
+                arguments["cursor"] = cursor
+            result = await tool.execute(**arguments)
+            visited.append(client.sent[-1]["page"])
+            cursor = result["response_metadata"]["next_cursor"]
+            if not cursor:
+                return visited
+
+    assert asyncio.run(scenario()) == [1, 2, 3]
+    assert all("cursor" not in sent for sent in client.sent)
+
+
+def test_cursor_is_rejected_for_another_query():
+    pages = {page: [_category(f"Cat {page}", 1, [_business("a", 1)])] for page in (1, 2)}
+    tool = DomainsGmbBacklinksCategoresTool(StubClient(pages, total_result_count=4))
+
+    async def scenario():
+        first = await tool.execute(input="reuse.example", lineCount=2)
+        cursor = first["response_metadata"]["next_cursor"]
+        return (
+            await tool.execute(input="reuse.example", lineCount=1, cursor=cursor),
+            await tool.execute(input="reuse.example", lineCount=2, is_claimed=True, cursor=cursor),
+            await tool.execute(input="reuse.example", lineCount=2, cursor="not-a-cursor"),
+            await tool.execute(input="reuse.example", lineCount=2, cursor=cursor)
+        )
+
+    other_line_count, other_filters, invalid, same_query = asyncio.run(scenario())
+    assert "ne correspond pas" in other_line_count["error"]
+    assert "ne correspond pas" in other_filters["error"]
+    assert invalid["error"] == "Le paramètre 'cursor' est invalide"
+    assert "error" not in same_query
+
+
+def test_failed_pages_are_reported_in_partial_errors():
+    client = StubClient({
+        1: [_category("Restaurant", 1, [_business("a", 1)])],
+        2: RuntimeError("timeout"),
+        3: [_category("Bakery", 1, [_business("b", 1)])]
+    }, total_result_count=3)
+    tool = DomainsGmbBacklinksCategoresTool(client)
+
+    result = asyncio.run(tool.execute(input="partial.example", lineCount=1, max_pages=3))
+
+    assert result["partial_errors"] == [{"page": 2, "error": "timeout"}]
+    assert sorted(category["name"] for category in result["all_categories"]) == ["Bakery", "Restaurant"]
@@ -0,0 +1,97 @@
+"""
+Tests de l'outil domains_gmb_backlinks_map : tables de seuils, cache des analyses et plusieurs domaines
+"""
+import asyncio
+
+import pytest
+
+from app.mcp_tools.haloscan.domains.domains_gmb_backlinks_map import DomainsGmbBacklinksMapTool
+
+
+class StubClient:
+    """Client Haloscan factice : une entreprise géolocalisée par domaine, sauf pour failing"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    async def post_async(self, endpoint, data):
+        self.calls.append(data["input"])
+        if data["input"] in self.failing:
+            raise RuntimeError("indisponible")
+        return {
+            "results": [{"name": "a", "latitude": 48.85, "longitude": 2.35, "rating_value": 4.6, "rating_count": 60}],
+            "total_result_count": 1
+        }
+
+
+def _reference_zoom(max_range):
+    """Échelle d'origine (comparaisons strictes)"""
+    for threshold, zoom in ((10, 6), (5, 7), (2, 8), (1, 9), (0.5, 10), (0.1, 12), (0.05, 13)):
+        if max_range > threshold:
+            return zoom
+    return 14
+
+
+def _reference_spread(max_range):
+    """Échelle d'origine (comparaisons strictes)"""
+    for threshold, spread in ((5, "very_wide"), (1, "wide"), (0.1, "medium"), (0.01, "narrow")):
+        if max_range > threshold:
+            return spread
+    return "very_narrow"
+
+
+def _reference_priority(is_claimed, rating_count, rating_value, photos, contact):
+    """Calcul d'origine de la priorité d'un marqueur (comparaisons inclusives)"""
+    score = 30 if is_claimed else 0
+    score += 25 if rating_count >= 50 else 15 if rating_count >= 20 else 10 if rating_count >= 5 else 0
+    score += 20 if rating_value >= 4.5 else 15 if rating_value >= 4.0 else 10 if rating_value >= 3.5 else 0
+    score += 15 if photos >= 10 else 10 if photos >= 5 else 0
+    return min(score + contact, 100)
+
+
+@pytest.mark.parametrize("max_range", [0, 0.01, 0.02, 0.05, 0.06, 0.1, 0.3, 0.5, 0.7, 1, 1.5, 2, 3, 5, 7, 10, 11])
+def test_zoom_and_spread_tables_match_strict_bounds(max_range):
+    tool = DomainsGmbBacklinksMapTool(None)
+    assert tool._zoom_from_range(max_range) == _reference_zoom(max_range)
+    assert tool._spread_from_range(max_range) == _reference_spread(max_range)
+
+
+def test_marker_priority_tables_match_inclusive_bounds():
+    tool = DomainsGmbBacklinksMapTool(None)
+    cases = [
+        (claimed, count, value, photos, contact)
+        for claimed in (0, 1)
+        for count in (0, 4, 5, 19, 20, 49, 50)
+        for value in (0, 3.4, 3.5, 3.9, 4.0, 4.4, 4.5, 5)
+        for photos in (0, 4, 5, 9, 10)
+        for contact in (0, 10)
+    ]
+    priorities = tool._calculate_marker_priorities(*map(list, zip(*cases)))
+    assert priorities == [_reference_priority(*case) for case in cases]
+
+
+def test_cached_analysis_is_not_shared_by_reference():
+    client = StubClient()
+    tool = DomainsGmbBacklinksMapTool(client)
+
+    async def scenario():
+        first = await tool.execute(input="cache.example")
+        first["summary"] = "modifié par l'appelant"
+        return await tool.execute(input="cache.example")
+
+    second = asyncio.run(scenario())
+    assert client.calls == ["cache.example"]
+    assert second["summary"] != "modifié par l'appelant"
+
+
+def test_multi_domain_maps_fail_per_domain():
+    tool = DomainsGmbBacklinksMapTool(StubClient(failing={"down.example"}))
+
+    result = asyncio.run(tool.execute(input="up.example", inputs=["down.example", "up.example"]))
+
+    assert result["domains"] == ["up.example", "down.example"]
+    assert "error" not in result["results_by_domain"]["up.example"]
+    assert result["results_by_domain"]["down.example"] == {
+        "error": "Erreur lors de la génération de la carte GMB: indisponible"
+    }
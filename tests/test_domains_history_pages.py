@@ -0,0 +1,45 @@
+"""
+Tests de l'outil domains_history_pages : récupération de toutes les pages (fetch_all)
+"""
+import asyncio
+
+from app.mcp_tools.haloscan.domains.domains_history_pages import DomainsHistoryPagesTool
+
+PERIOD = {"date_from": "2024-01-01", "date_to": "2024-02-01"}
+
+
+class StubClient:
+    """Client Haloscan factice : 250 pages d'historique réparties par 100, la page 2 échoue"""
+
+    def __init__(self):
+        self.pages = []
+
+    async def post_async(self, endpoint, data):
+        page = data["page"]
+        self.pages.append(page)
+        await asyncio.sleep(0.01)
+        if page == 2:
+            raise RuntimeError("page 2 indisponible")
+        start = (page - 1) * data["lineCount"]
+        return {
+            "results": [{"url": f"/page-{start + i}", "total_traffic": 1} for i in range(min(100, 250 - start))],
+            "total_result_count": 250
+        }
+
+
+def test_fetch_all_coalesces_pages_and_reports_failures():
+    client = StubClient()
+    tool = DomainsHistoryPagesTool(client)
+
+    async def scenario():
+        return await asyncio.gather(
+            tool.execute(input="pages.example", fetch_all=True, concurrency=None, **PERIOD),
+            tool.execute(input="pages.example", fetch_all=True, analyze=False, **PERIOD)
+        )
+
+    analysis, raw = asyncio.run(scenario())
+
+    assert sorted(client.pages) == [1, 2, 3]
+    assert analysis["partial_errors"] == [{"page": 2, "error": "page 2 indisponible"}]
+    assert raw["partial_errors"] == analysis["partial_errors"]
+    assert len(raw["raw"]["results"]) == 150
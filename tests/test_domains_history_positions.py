@@ -0,0 +1,78 @@
+"""
+Tests de l'outil domains_history_positions : pages en échec et seuils des recommandations
+"""
+import asyncio
+from bisect import bisect_right
+
+import pytest
+
+from app.mcp_tools.haloscan.domains.domains_history_positions import (
+    DomainsHistoryPositionsTool,
+    _POSITION_THRESHOLDS,
+    _RETENTION_THRESHOLDS,
+    _TRAFFIC_THRESHOLDS,
+)
+
+PERIOD = {"date_from": "2024-01-01", "date_to": "2024-02-01"}
+
+
+class StubClient:
+    """Client Haloscan factice : 100 mots-clés par page, les pages listées dans failing échouent"""
+
+    def __init__(self, total, failing=()):
+        self.total = total
+        self.failing = set(failing)
+        self.pages = []
+
+    async def post_async(self, endpoint, data):
+        page = data["page"]
+        self.pages.append(page)
+        if page in self.failing:
+            raise RuntimeError(f"page {page} indisponible")
+        start = (page - 1) * data["lineCount"]
+        count = max(0, min(data["lineCount"], self.total - start))
+        return {
+            "results": [{"keyword": f"kw {start + i}", "most_recent_traffic": 1} for i in range(count)],
+            "total_result_count": self.total
+        }
+
+
+def _reference_level(value, low, high):
+    """Classement d'origine (if/elif stricts) : 0 sous low, 2 au-dessus de high, 1 sinon"""
+    if value > high:
+        return 2
+    if value < low:
+        return 0
+    return 1
+
+
+def test_max_rows_reports_failed_pages():
+    client = StubClient(total=300, failing={2})
+    tool = DomainsHistoryPositionsTool(client)
+
+    result = asyncio.run(tool.execute(input="partial.example", max_rows=300, **PERIOD))
+
+    assert sorted(client.pages) == [1, 2, 3]
+    assert result["partial_errors"] == [{"page": 2, "error": "page 2 indisponible"}]
+    assert result["statistics"]["keywords_analyzed"] == 200
+
+
+def test_next_page_prefetch_is_opt_in():
+    async def scenario(domain, **kwargs):
+        client = StubClient(total=300)
+        await DomainsHistoryPositionsTool(client).execute(input=domain, lineCount=100, **PERIOD, **kwargs)
+        await asyncio.sleep(0.01)
+        return client.pages
+
+    assert asyncio.run(scenario("oneshot.example")) == [1]
+    assert asyncio.run(scenario("prefetch.example", prefetch_next_page=True)) == [1, 2]
+
+
+@pytest.mark.parametrize("thresholds, low, high", [
+    (_RETENTION_THRESHOLDS, 50, 80),
+    (_TRAFFIC_THRESHOLDS, 10, 100),
+    (_POSITION_THRESHOLDS, 10, 20),
+])
+def test_threshold_tables_match_strict_bounds(thresholds, low, high):
+    for value in (0, low - 0.01, low, low + 0.01, high - 0.01, high, high + 1e-9, high + 0.01, high * 10):
+        assert bisect_right(thresholds, value) == _reference_level(value, low, high), value
@@ -0,0 +1,60 @@
+"""
+Tests de l'outil domains_keywords : mots-clés manquants et clés de cache canoniques
+"""
+import asyncio
+
+from app.mcp_tools.haloscan.domains.domains_keywords import DomainsKeywordsTool, _canonical_params
+
+
+class StubClient:
+    """Client Haloscan factice retournant les mots-clés positionnés donnés"""
+
+    def __init__(self, found_keywords):
+        self.found_keywords = found_keywords
+        self.calls = 0
+
+    async def post_async(self, endpoint, data):
+        self.calls += 1
+        return {
+            "results": [{"keyword": keyword, "position": 5, "traffic": 10} for keyword in self.found_keywords],
+            "returned_result_count": len(self.found_keywords)
+        }
+
+
+def _params(target, keywords, mode):
+    return {"input": target, "keywords": keywords, "mode": mode}
+
+
+def test_missing_keywords_ignore_case_and_spaces():
+    tool = DomainsKeywordsTool(StubClient(["seo paris", "Agence Web"]))
+
+    result = asyncio.run(tool.execute(
+        input="missing.example", keywords=["SEO Paris ", "agence web", "netlinking"]
+    ))
+
+    assert result["missing_keywords"] == ["netlinking"]
+
+
+def test_canonical_params_normalise_the_host_in_domain_and_root_modes():
+    for mode in ("domain", "root"):
+        assert _canonical_params(_params("https://Example.COM/", ["b", "A "], mode)) == \
+            _canonical_params(_params("example.com", ["a", "b", "a"], mode))
+
+
+def test_canonical_params_keep_the_path_and_other_modes_verbatim():
+    assert _canonical_params(_params("Example.com/Page", [], "domain"))["input"] == "example.com/Page"
+    assert _canonical_params(_params("https://Example.com/Page", [], "url"))["input"] == "https://Example.com/Page"
+    assert _canonical_params(_params("Example.com", [], "auto"))["input"] == "Example.com"
+    assert _canonical_params(_params("www.example.com", [], "domain"))["input"] == "www.example.com"
+
+
+def test_keyword_variants_share_one_api_call():
+    client = StubClient(["seo"])
+    tool = DomainsKeywordsTool(client)
+
+    async def scenario():
+        await tool.execute(input="shared.example", mode="domain", keywords=["SEO", "web"])
+        await tool.execute(input="https://Shared.example", mode="domain", keywords=["web ", "seo"])
+
+    asyncio.run(scenario())
+    assert client.calls == 1